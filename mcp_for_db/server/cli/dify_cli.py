@@ -40,7 +40,8 @@ logger.setLevel(LOG_LEVEL)
 @click.option("--host", default="0.0.0.0", help="主机地址")
 @click.option("--port", type=int, help="端口号")
 @click.option("--oauth", is_flag=True, help="启用OAuth认证")
-def dify_main(mode, host, port, oauth):
+@click.option("--debug", is_flag=True, help="开启调试模式（异常时返回完整堆栈）")
+def dify_main(mode, host, port, oauth, debug):
     """DiFy MCP 服务启动器"""
 
     if mode == "stdio":
@@ -76,10 +77,10 @@ def dify_main(mode, host, port, oauth):
             asyncio.run(service.run_stdio())
         elif mode == "sse":
             default_port = port or 9001
-            service.run_sse(host, default_port)
+            service.run_sse(host, default_port, debug=debug)
         elif mode == "streamable_http":
             default_port = port or 3001
-            service.run_streamable_http(host, default_port, oauth=oauth)
+            service.run_streamable_http(host, default_port, oauth=oauth, debug=debug)
 
     except Exception as e:
         logger.error(f"DiFy服务启动失败: {e}")
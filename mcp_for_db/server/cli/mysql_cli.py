@@ -2,7 +2,7 @@ import asyncio
 import os
 import click
 from mcp_for_db import LOG_LEVEL
-from mcp_for_db.server.core import ServiceManager, EnvDistributor
+from mcp_for_db.server.core import ServiceManager, EnvDistributor, BaseMCPServer
 from mcp_for_db.server.shared.utils import get_logger, configure_logger
 
 logger = get_logger(__name__)
@@ -35,12 +35,22 @@ logger.setLevel(LOG_LEVEL)
 """
 
 
+def create_streamable_http_app():
+    """uvicorn 多进程模式下的应用工厂: 每个工作进程独立创建服务及其资源（连接池等）"""
+    # 创建 ServiceManager 时会重新加载配置并重置 os.environ，开关须提前读取
+    http_options = BaseMCPServer.worker_http_options()
+    service = ServiceManager().create_service("mysql")
+    return service.build_streamable_http_app(**http_options)
+
+
 @click.command()
 @click.option("--mode", default="stdio", type=click.Choice(["stdio", "sse", "streamable_http"]), help="运行模式")
 @click.option("--host", default="0.0.0.0", help="主机地址")
 @click.option("--port", type=int, help="端口号（SSE默认9000，HTTP默认3000）")
 @click.option("--oauth", is_flag=True, help="启用OAuth认证")
-def mysql_main(mode, host, port, oauth):
+@click.option("--workers", type=int, default=1, help="工作进程数（仅 streamable_http 模式）")
+@click.option("--debug", is_flag=True, help="开启调试模式（异常时返回完整堆栈）")
+def mysql_main(mode, host, port, oauth, workers, debug):
     """MySQL MCP 服务启动器"""
 
     if mode == "stdio":
@@ -79,10 +89,11 @@ def mysql_main(mode, host, port, oauth):
             asyncio.run(service.run_stdio())
         elif mode == "sse":
             default_port = port or 9000
-            service.run_sse(host, default_port)
+            service.run_sse(host, default_port, debug=debug)
         elif mode == "streamable_http":
             default_port = port or 3000
-            service.run_streamable_http(host, default_port, oauth=oauth)
+            service.run_streamable_http(host, default_port, oauth=oauth, workers=workers, debug=debug,
+                                        app_factory="mcp_for_db.server.cli.mysql_cli:create_streamable_http_app")
 
     except Exception as e:
         logger.error(f"MySQL服务启动失败: {e}")
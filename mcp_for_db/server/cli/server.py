@@ -355,7 +355,7 @@ class AggregatedMCPServer:
         @self.aggregated_server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
             self.logger.info(f"调用工具: {name}")
-            self.logger.debug(f"工具参数: {arguments}")
+            self.logger.debug("工具参数: %s", arguments)
 
             # 解析服务名称和工具名称
             service_name = None
@@ -494,6 +494,11 @@ class AggregatedMCPServer:
     async def cleanup_all_services(self):
         """清理所有子服务"""
         for service_name, sub_server in self.sub_servers.items():
+            # 未完成初始化（或已由自身关闭）的子服务无需再清理
+            if not getattr(sub_server, 'resources_initialized', True):
+                self.logger.debug("子服务 %s 资源未初始化，跳过清理", service_name)
+                continue
+
             try:
                 self.logger.info(f"清理子服务: {service_name}")
                 if hasattr(sub_server, 'close_global_resources'):
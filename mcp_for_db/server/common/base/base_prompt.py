@@ -1,4 +1,5 @@
-from typing import ClassVar, Dict, Type, Any
+import functools
+from typing import ClassVar, Dict, Type, Any, List, Optional
 
 from mcp import GetPromptResult
 from mcp.types import Prompt
@@ -14,6 +15,8 @@ logger.setLevel(LOG_LEVEL)
 class PromptRegistry:
     """prompt注册表，用于管理所有prompt实例"""
     _prompts: ClassVar[Dict[str, 'BasePrompt']] = {}
+    # get_all_prompts 的结果缓存，注册新 prompt 时失效
+    _all_prompts_cache: ClassVar[Optional[List[Prompt]]] = None
 
     @classmethod
     def register(cls, prompt_class: Type['BasePrompt']) -> Type['BasePrompt']:
@@ -27,6 +30,7 @@ class PromptRegistry:
         """
         prompt = prompt_class()
         cls._prompts[prompt.name] = prompt
+        cls._all_prompts_cache = None
         return prompt_class
 
     @classmethod
@@ -53,7 +57,22 @@ class PromptRegistry:
         Returns:
             所有prompt的描述列表
         """
-        return [prompt.get_prompt() for prompt in cls._prompts.values()]
+        if cls._all_prompts_cache is None:
+            cls._all_prompts_cache = [prompt.get_prompt() for prompt in cls._prompts.values()]
+        return list(cls._all_prompts_cache)
+
+
+def _cache_prompt(get_prompt):
+    """缓存 get_prompt 的结果：prompt 描述是静态的，每个实例只构建一次"""
+
+    @functools.wraps(get_prompt)
+    def wrapper(self) -> Prompt:
+        prompt = self.__dict__.get("_prompt")
+        if prompt is None:
+            prompt = self._prompt = get_prompt(self)
+        return prompt
+
+    return wrapper
 
 
 class BasePrompt:
@@ -63,6 +82,8 @@ class BasePrompt:
     def __init_subclass__(cls, **kwargs):
         """子类初始化时自动注册到prompt注册表"""
         super().__init_subclass__(**kwargs)
+        if "get_prompt" in cls.__dict__:
+            cls.get_prompt = _cache_prompt(cls.__dict__["get_prompt"])
         if cls.name:  # 只注册有名称的prompt
             PromptRegistry.register(cls)
 
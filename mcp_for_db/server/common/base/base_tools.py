@@ -1,4 +1,4 @@
-from typing import Dict, Any, Sequence, Type, ClassVar, List
+from typing import Dict, Any, Sequence, Type, ClassVar, List, Optional
 from mcp.types import TextContent, Tool
 
 from mcp_for_db import LOG_LEVEL
@@ -30,12 +30,15 @@ class ToolCall:
 class ToolRegistry:
     """工具注册表，用于管理所有工具实例"""
     _tools: ClassVar[Dict[str, 'BaseHandler']] = {}
+    # get_all_tools 的结果缓存，注册新工具时失效
+    _all_tools_cache: ClassVar[Optional[List[Tool]]] = None
 
     @classmethod
     def register(cls, tool_class: Type['BaseHandler']) -> Type['BaseHandler']:
         """注册工具类"""
         tool = tool_class()
         cls._tools[tool.name] = tool
+        cls._all_tools_cache = None
 
         logger.info(f"🔧正在注册工具： {tool.name}")
         # 自动应用增强描述（如果存在）
@@ -56,9 +59,19 @@ class ToolRegistry:
 
     @classmethod
     def get_all_tools(cls) -> list[Tool]:
-        """获取所有工具的描述（使用增强描述）"""
+        """获取所有工具的描述（使用增强描述）
+
+        工具描述在注册后不再变化，构建一次后缓存，每次返回列表副本
+        """
+        logger.info("当前请求的服务中一共有工具： %s", len(cls._tools))
+        if cls._all_tools_cache is None:
+            cls._all_tools_cache = cls._build_all_tools()
+        return list(cls._all_tools_cache)
+
+    @classmethod
+    def _build_all_tools(cls) -> List[Tool]:
+        """构建所有工具的描述"""
         tools = []
-        logger.info(f"当前请求的服务中一共有工具： {len(cls._tools.values())}")
         for tool in cls._tools.values():
             # 优先使用增强描述
             description = getattr(tool, 'enhanced_description', None) or tool.description
@@ -174,6 +187,8 @@ class ToolSelector:
         "medium": ["get_table_name", "get_table_desc", "get_table_index", "get_table_stats"],
         "low": ["analyze_query_performance", "collect_table_stats", "get_db_health_index_usage"]
     }
+    # 按优先级从高到低展开的工具顺序，类加载时计算一次
+    _PRIORITY_ORDER = tuple(TOOL_PRIORITY["high"] + TOOL_PRIORITY["medium"] + TOOL_PRIORITY["low"])
 
     # 工具类别映射
     TOOL_CATEGORIES = {
@@ -250,22 +265,13 @@ class ToolSelector:
             if tool in tool_params and tool_params[tool]:
                 return tool
 
-        # 2. 其次选择高优先级工具
-        for tool in ToolSelector.TOOL_PRIORITY["high"]:
-            if tool in recommended_tools:
-                return tool
-
-        # 3. 再次选择中优先级工具
-        for tool in ToolSelector.TOOL_PRIORITY["medium"]:
-            if tool in recommended_tools:
-                return tool
-
-        # 4. 最后选择低优先级工具
-        for tool in ToolSelector.TOOL_PRIORITY["low"]:
-            if tool in recommended_tools:
+        # 2. 按高、中、低优先级顺序选择工具
+        recommended = set(recommended_tools)
+        for tool in ToolSelector._PRIORITY_ORDER:
+            if tool in recommended:
                 return tool
 
-        # 5. 如果都没有，返回第一个推荐工具
+        # 3. 如果都没有，返回第一个推荐工具
         return recommended_tools[0] if recommended_tools else "sql_executor"
 ########################################################################################################################
 ########################################################################################################################
@@ -1,4 +1,5 @@
-from .config_manager import EnvironmentType, SQLRiskLevel, DatabaseAccessLevel, ConfigManager, strtobool, EnvFileManager
+from .config_manager import EnvironmentType, SQLRiskLevel, DatabaseAccessLevel, ConfigManager, strtobool, EnvFileManager, \
+    load_env_file, read_env_file
 from .base_server import BaseMCPServer
 from .service_manager import ServiceManager
 from .env_distribute import EnvDistributor
@@ -12,5 +13,7 @@ __all__ = [
     "ServiceManager",
     "strtobool",
     "EnvFileManager",
+    "load_env_file",
+    "read_env_file",
     "EnvDistributor"
 ]
@@ -1,27 +1,54 @@
 import asyncio
 import contextlib
+import os
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator
-from typing import Dict, Any, List, Sequence
-import uvicorn
+from typing import Dict, Any, List, Sequence, Optional, TYPE_CHECKING
 
 from mcp.server.lowlevel import Server
-from mcp.server.sse import SseServerTransport
 from mcp.server.stdio import stdio_server
 
 from mcp.types import Tool, TextContent, Prompt, GetPromptResult, Resource
 from pydantic.networks import AnyUrl
-from starlette.applications import Starlette
-from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
-from starlette.middleware import Middleware
 from starlette.types import Scope, Receive, Send
-from starlette.responses import Response
-from starlette.routing import Route, Mount
+
+# uvicorn、Starlette 及 SSE/流式HTTP 传输仅在对应模式下按需导入，stdio 模式启动时无需加载
+if TYPE_CHECKING:
+    from starlette.applications import Starlette
 
 from mcp_for_db import LOG_LEVEL
 from mcp_for_db.server.shared.utils import get_logger, configure_logger
 from mcp_for_db.server.core import ConfigManager
 
+# uvicorn 事件循环实现: auto 时由 uvicorn 在安装了 uvloop 的情况下自行选用，否则使用标准 asyncio
+# uvloop 与 httptools 由可选依赖组 fast 提供: pip install "mcp-for-db[fast]"
+UVICORN_LOOP = "auto"
+
+
+# 多进程模式下流式HTTP开关经环境变量传给工作进程的应用工厂
+WORKER_HTTP_OPTION_ENVS = {
+    "json_response": "MCP_HTTP_JSON_RESPONSE",
+    "oauth": "MCP_HTTP_OAUTH",
+    "debug": "MCP_HTTP_DEBUG",
+}
+
+
+class RequestContextMiddleware:
+    """ASGI 中间件: 在转发 HTTP 请求前建立服务的请求上下文（会话配置等上下文变量）"""
+
+    def __init__(self, app, server: "BaseMCPServer"):
+        self.app = app
+        self.server = server
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = await self.server.create_request_context()
+        async with context:
+            await self.app(scope, receive, send)
+
 
 class BaseMCPServer(ABC):
     """MCP 多服务基类"""
@@ -34,6 +61,8 @@ class BaseMCPServer(ABC):
         self.logger = get_logger(f"mcp_server_{service_name}")
         self.resources_initialized = False
         self.server_setup_completed = False
+        # 初始化选项在路由注册后不再变化，首次使用时构建并复用
+        self._init_options = None
 
         # 设置日志级别
         self.logger.setLevel(LOG_LEVEL)
@@ -73,6 +102,12 @@ class BaseMCPServer(ABC):
 
         return default_context()
 
+    def get_initialization_options(self):
+        """获取服务器初始化选项（路由注册完成后构建一次，之后各连接复用）"""
+        if self._init_options is None or not self.server_setup_completed:
+            self._init_options = self.server.create_initialization_options()
+        return self._init_options
+
     async def setup_server(self):
         """设置服务器路由"""
         if self.server_setup_completed:
@@ -97,13 +132,13 @@ class BaseMCPServer(ABC):
                         return registry.get_all_resources()
                 return []
             except Exception as e:
-                self.logger.error(f"获取资源列表失败: {str(e)}", exc_info=True)
+                self.logger.error("获取资源列表失败: %s", e, exc_info=True)
                 return []
 
         @self.server.read_resource()
         async def handle_read_resource(uri: AnyUrl) -> str:
             try:
-                self.logger.info(f"开始读取资源: {uri}")
+                self.logger.info("开始读取资源: %s", uri)
                 registry = self.get_resource_registry()
                 if registry is None:
                     raise ValueError("资源注册表未初始化")
@@ -118,10 +153,10 @@ class BaseMCPServer(ABC):
 
                 if content is None:
                     content = "null"
-                self.logger.info(f"资源 {uri} 读取成功，内容长度: {len(content)}")
+                self.logger.info("资源 %s 读取成功，内容长度: %s", uri, len(content))
                 return content
             except Exception as e:
-                self.logger.error(f"读取资源失败: {str(e)}", exc_info=True)
+                self.logger.error("读取资源失败: %s", e, exc_info=True)
                 raise
 
         # 注册提示词处理器
@@ -142,16 +177,16 @@ class BaseMCPServer(ABC):
                 else:
                     prompts = []
 
-                self.logger.info(f"成功获取到 {len(prompts)} 个提示模板")
+                self.logger.info("成功获取到 %s 个提示模板", len(prompts))
                 return prompts
             except Exception as e:
-                self.logger.error(f"获取提示词列表失败: {str(e)}", exc_info=True)
+                self.logger.error("获取提示词列表失败: %s", e, exc_info=True)
                 return []
 
         @self.server.get_prompt()
         async def handle_get_prompt(name: str, arguments: Dict[str, Any] | None) -> GetPromptResult:
-            self.logger.info(f"开始处理获取提示模板请求 [name={name}]")
-            self.logger.debug(f"请求参数: {arguments}")
+            self.logger.info("开始处理获取提示模板请求 [name=%s]", name)
+            self.logger.debug("请求参数: %s", arguments)
 
             try:
                 registry = self.get_prompt_registry()
@@ -166,12 +201,12 @@ class BaseMCPServer(ABC):
                 else:
                     raise ValueError(f"未找到提示模板: {name}")
 
-                self.logger.debug(f"找到提示模板 '{name}'")
+                self.logger.debug("找到提示模板 '%s'", name)
                 result = await prompt.run_prompt(arguments)
-                self.logger.info(f"提示模板 '{name}' 执行成功")
+                self.logger.info("提示模板 '%s' 执行成功", name)
                 return result
             except Exception as e:
-                self.logger.error(f"处理提示模板 '{name}' 时出错: {str(e)}")
+                self.logger.error("处理提示模板 '%s' 时出错: %s", name, e)
                 raise
 
         # 注册工具处理器
@@ -192,16 +227,16 @@ class BaseMCPServer(ABC):
                 else:
                     tools = []
 
-                self.logger.info(f"成功获取到 {len(tools)} 个工具")
+                self.logger.info("成功获取到 %s 个工具", len(tools))
                 return tools
             except Exception as e:
-                self.logger.error(f"获取工具列表失败: {str(e)}", exc_info=True)
+                self.logger.error("获取工具列表失败: %s", e, exc_info=True)
                 return []
 
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-            self.logger.info(f"开始调用工具 [name={name}]")
-            self.logger.debug(f"工具参数: {arguments}")
+            self.logger.info("开始调用工具 [name=%s]", name)
+            self.logger.debug("工具参数: %s", arguments)
 
             try:
                 registry = self.get_tool_registry()
@@ -216,12 +251,12 @@ class BaseMCPServer(ABC):
                 else:
                     raise ValueError(f"未找到工具: {name}")
 
-                self.logger.debug(f"找到工具 '{name}'")
+                self.logger.debug("找到工具 '%s'", name)
                 result = await tool.run_tool(arguments)
-                self.logger.info(f"工具 '{name}' 调用成功")
+                self.logger.info("工具 '%s' 调用成功", name)
                 return result
             except Exception as e:
-                self.logger.error(f"调用工具 '{name}' 时出错: {str(e)}")
+                self.logger.error("调用工具 '%s' 时出错: %s", name, e)
                 raise
 
         self.server_setup_completed = True
@@ -244,7 +279,7 @@ class BaseMCPServer(ABC):
             self.logger.info("所有资源初始化完成")
             self.resources_initialized = True
         except Exception as e:
-            self.logger.exception(f"资源初始化失败:{e}")
+            self.logger.exception("资源初始化失败:%s", e)
             raise
 
     async def close_global_resources(self):
@@ -257,7 +292,7 @@ class BaseMCPServer(ABC):
         try:
             await self.close_resources()
         except Exception as e:
-            self.logger.exception(f"关闭资源时出错: {str(e)}")
+            self.logger.exception("关闭资源时出错: %s", e)
         finally:
             self.resources_initialized = False
             self.server_setup_completed = False
@@ -281,24 +316,33 @@ class BaseMCPServer(ABC):
                         await self.server.run(
                             read_stream,
                             write_stream,
-                            self.server.create_initialization_options()
+                            self.get_initialization_options()
                         )
 
                     self.logger.info("标准输入输出模式服务结束")
                 except Exception as e:
-                    self.logger.critical(f"标准输入输出模式服务器错误: {str(e)}")
+                    self.logger.critical("标准输入输出模式服务器错误: %s", e)
                     raise
         finally:
             await self.close_global_resources()
-            await asyncio.sleep(0.5)
 
-    def run_sse(self, host: str = "0.0.0.0", port: int = 9000):
-        """运行SSE模式的服务器"""
+    def run_sse(self, host: str = "0.0.0.0", port: int = 9000, debug: bool = False):
+        """运行SSE模式的服务器
+
+        Args:
+            debug: 是否开启 Starlette 调试模式（异常时渲染完整堆栈），仅用于开发排查
+        """
+        import uvicorn
+        from mcp.server.sse import SseServerTransport
+        from starlette.applications import Starlette
+        from starlette.responses import Response
+        from starlette.routing import Route, Mount
+
         self.logger.info("启动SSE(Server-Sent Events)模式服务器")
         sse = SseServerTransport("/messages/")
 
         async def handle_sse(request):
-            self.logger.info(f"新的SSE连接 [client={request.client}]")
+            self.logger.info("新的SSE连接 [client=%s]", request.client)
 
             # 在协议层面创建上下文
             context = await self.create_request_context()
@@ -307,12 +351,12 @@ class BaseMCPServer(ABC):
                         request.scope, request.receive, request._send
                 ) as streams:
                     try:
-                        await self.server.run(streams[0], streams[1], self.server.create_initialization_options())
+                        await self.server.run(streams[0], streams[1], self.get_initialization_options())
                     except Exception as e:
-                        self.logger.error(f"SSE连接处理异常: {str(e)}")
+                        self.logger.error("SSE连接处理异常: %s", e)
                         raise
 
-            self.logger.info(f"SSE连接断开 [client={request.client}]")
+            self.logger.info("SSE连接断开 [client=%s]", request.client)
             return Response(status_code=204)
 
         @contextlib.asynccontextmanager
@@ -322,10 +366,9 @@ class BaseMCPServer(ABC):
                 yield
             finally:
                 await self.close_global_resources()
-                await asyncio.sleep(0.5)
 
         starlette_app = Starlette(
-            debug=True,
+            debug=debug,
             routes=[
                 Route("/sse", endpoint=handle_sse),
                 Mount("/messages/", app=sse.handle_post_message)
@@ -333,22 +376,27 @@ class BaseMCPServer(ABC):
             lifespan=lifespan
         )
 
-        self.logger.info(f"SSE服务器启动中 [host={host}, port={port}]")
+        self.logger.info("SSE服务器启动中 [host=%s, port=%s]", host, port)
         config = uvicorn.Config(
             app=starlette_app,
             host=host,
             port=port,
-            loop="asyncio",
+            loop=UVICORN_LOOP,
+            access_log=False,
             log_config=None
         )
 
         server = uvicorn.Server(config)
         server.run()
 
-    def run_streamable_http(self, host: str = "0.0.0.0", port: int = 3000,
-                            json_response: bool = False, oauth: bool = False):
-        """运行流式HTTP模式的服务器"""
-        self.logger.info("启动Streamable HTTP模式服务器")
+    def build_streamable_http_app(self, json_response: bool = False, oauth: bool = False,
+                                  debug: bool = False) -> "Starlette":
+        """构建流式HTTP模式的 Starlette 应用"""
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.middleware import Middleware
+        from starlette.routing import Route, Mount
+
         session_manager = StreamableHTTPSessionManager(
             app=self.server,
             json_response=json_response,
@@ -367,16 +415,14 @@ class BaseMCPServer(ABC):
                         await send({"type": "lifespan.shutdown.complete"})
                         return
             else:
-                self.logger.info(f"新的HTTP请求 [method={scope['method']}, path={scope['path']}]")
+                self.logger.info("新的HTTP请求 [method=%s, path=%s, client=%s]", scope['method'], scope['path'],
+                                 scope.get('client'))
                 try:
-                    # 在协议层面创建上下文
-                    context = await self.create_request_context()
-                    async with context:
-                        await session_manager.handle_request(scope, receive, send)
-
-                    self.logger.info(f"HTTP请求处理完成 [method={scope['method']}, path={scope['path']}]")
+                    # 请求上下文由 RequestContextMiddleware 建立
+                    await session_manager.handle_request(scope, receive, send)
+                    self.logger.info("HTTP请求处理完成 [method=%s, path=%s]", scope['method'], scope['path'])
                 except Exception as e:
-                    self.logger.error(f"HTTP请求处理异常: {str(e)}")
+                    self.logger.error("HTTP请求处理异常: %s", e)
                     raise
 
         @contextlib.asynccontextmanager
@@ -390,7 +436,7 @@ class BaseMCPServer(ABC):
                 await self.close_global_resources()
                 self.logger.info("服务器关闭完成")
 
-        routes = [Mount("/mcp", app=handle_streamable_http)]
+        routes = [Mount("/mcp", app=RequestContextMiddleware(handle_streamable_http, self))]
         middleware = []
 
         # 如果需要OAuth
@@ -407,21 +453,67 @@ class BaseMCPServer(ABC):
             except ImportError:
                 self.logger.warning("OAuth模块未找到，跳过OAuth配置")
 
-        starlette_app = Starlette(
-            debug=True,
+        return Starlette(
+            debug=debug,
             routes=routes,
             middleware=middleware,
             lifespan=lifespan
         )
 
+    @staticmethod
+    def worker_http_options() -> Dict[str, bool]:
+        """
+        读取主进程传给工作进程的流式HTTP开关，作为 build_streamable_http_app 的参数
+
+        须在创建 ServiceManager 之前调用: 加载服务配置时会重置 os.environ
+        """
+        return {name: os.environ.get(env) == "1" for name, env in WORKER_HTTP_OPTION_ENVS.items()}
+
+    def run_streamable_http(self, host: str = "0.0.0.0", port: int = 3000,
+                            json_response: bool = False, oauth: bool = False,
+                            workers: int = 1, app_factory: Optional[str] = None, debug: bool = False):
+        """运行流式HTTP模式的服务器
+
+        Args:
+            debug: 是否开启 Starlette 调试模式（异常时渲染完整堆栈），仅用于开发排查
+            workers: uvicorn 工作进程数，大于 1 时需要提供 app_factory
+            app_factory: 应用工厂的导入路径（如 "module:func"），每个工作进程通过它独立创建服务及其资源
+        """
+        import uvicorn
+
+        self.logger.info("启动Streamable HTTP模式服务器")
+
+        if workers > 1:
+            if app_factory:
+                # 工作进程通过应用工厂重新创建服务，开关经环境变量传递（子进程继承父进程环境）
+                os.environ.update({env: "1" if flag else "0" for env, flag in
+                                   zip(WORKER_HTTP_OPTION_ENVS.values(), (json_response, oauth, debug))})
+                self.logger.info("Streamable HTTP服务器启动中 [host=%s, port=%s, workers=%s]", host, port, workers)
+                uvicorn.run(
+                    app_factory,
+                    factory=True,
+                    host=host,
+                    port=port,
+                    workers=workers,
+                    loop=UVICORN_LOOP,
+                    lifespan="on",
+                    access_log=False,
+                    log_config=None
+                )
+                return
+            self.logger.warning("未提供应用工厂，无法启用多进程模式，使用单进程运行")
+
+        starlette_app = self.build_streamable_http_app(json_response=json_response, oauth=oauth, debug=debug)
         config = uvicorn.Config(
             app=starlette_app,
             host=host,
             port=port,
+            loop=UVICORN_LOOP,
             lifespan="on",
+            access_log=False,
             log_config=None
         )
 
         server = uvicorn.Server(config)
-        self.logger.info(f"Streamable HTTP服务器启动中 [host={host}, port={port}]")
+        self.logger.info("Streamable HTTP服务器启动中 [host=%s, port=%s]", host, port)
         server.run()
@@ -1,7 +1,8 @@
 import os
-from typing import Dict, Any, List, Set
+import re
+import tempfile
+from typing import Dict, Any, List, Set, Tuple
 from pathlib import Path
-from dotenv import load_dotenv
 from enum import Enum, IntEnum
 
 
@@ -26,16 +27,87 @@ class DatabaseAccessLevel(Enum):
     PERMISSIVE = 'permissive'
 
 
+# 布尔值查找表: 一次字典查找即可得到结果
+_BOOL_MAP: Dict[str, bool] = {
+    'true': True, '1': True, 'yes': True, 'y': True, 't': True,
+    'false': False, '0': False, 'no': False, 'n': False, 'f': False,
+}
+# 常见写法预先折叠大小写，命中时无需再构造小写字符串
+_BOOL_MAP_FAST: Dict[str, bool] = {
+    **_BOOL_MAP,
+    **{k.upper(): v for k, v in _BOOL_MAP.items()},
+    **{k.capitalize(): v for k, v in _BOOL_MAP.items()},
+}
+
+
 def strtobool(v: Any) -> bool:
     """将字符串转换为布尔值"""
+    if v is True or v is False:
+        return v
+    if type(v) is str:
+        r = _BOOL_MAP_FAST.get(v)
+        if r is not None:
+            return r
+    return _strtobool_slow(v)
+
+
+def _strtobool_slow(v: Any) -> bool:
+    """strtobool 的通用路径: 统一转为小写后判断"""
     if isinstance(v, bool):
         return v
     v = str(v).lower()
-    if v in {'true', '1', 'yes', 'y', 't'}:
-        return True
-    elif v in {'false', '0', 'no', 'n', 'f'}:
-        return False
-    raise ValueError(f"无法解析的布尔值: {v}")
+    r = _BOOL_MAP.get(v)
+    if r is None:
+        raise ValueError(f"无法解析的布尔值: {v}")
+    return r
+
+
+# 已解析的 env 文件缓存: 路径 -> (文件修改时间, 解析结果)，文件未修改时不再重新解析
+_DOTENV_CACHE: Dict[str, Tuple[int, Dict[str, str]]] = {}
+
+
+def read_env_file(env_path: Any, reload: bool = False) -> Dict[str, str]:
+    """读取 env 文件内容而不修改环境变量，解析结果按路径和修改时间缓存
+
+    Args:
+        env_path: env 文件路径
+        reload: 是否忽略缓存，强制重新读取文件
+
+    Returns:
+        Dict[str, str]: 文件中的配置项，文件不存在时返回空字典（调用方不应修改）
+    """
+    path = str(env_path)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+
+    cached = None if reload else _DOTENV_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    # 延迟导入 dotenv，只有真正需要解析文件时才付出导入开销
+    from dotenv import dotenv_values
+    values = {k: v for k, v in dotenv_values(path).items() if v is not None}
+    _DOTENV_CACHE[path] = (mtime, values)
+    return values
+
+
+def load_env_file(env_path: Any, override: bool = True, reload: bool = False) -> None:
+    """加载 env 文件到环境变量
+
+    Args:
+        env_path: env 文件路径
+        override: 是否覆盖已存在的环境变量
+        reload: 是否忽略缓存，强制重新读取文件
+    """
+    values = read_env_file(env_path, reload=reload)
+    if override:
+        os.environ.update(values)
+        return
+    for k, v in values.items():
+        if k not in os.environ:
+            os.environ[k] = v
 
 
 class ConfigManager:
@@ -50,40 +122,47 @@ class ConfigManager:
         self.global_config: Dict[str, Any] = {}  # 全局配置: common.env
         self._load_configs()
 
-    def _load_configs(self):
+    def reload(self) -> None:
+        """强制重新读取所有配置文件"""
+        self.configs = {}
+        self._load_configs(reload=True)
+
+    def _load_configs(self, reload: bool = False):
         """加载所有配置文件"""
         # 加载通用配置（common.env）
         common_env = os.path.join(self.config_dir, "common.env")
         if os.path.exists(common_env):
-            load_dotenv(common_env, override=True)
+            load_env_file(common_env, override=True, reload=reload)
 
         # 保存全局配置（仅包含 common.env 的内容）
         self.global_config = dict(os.environ)
 
-        # 加载各服务的特定配置
+        # 加载各服务的特定配置: 直接读取文件内容合并，不再为每个服务清空并回写环境变量
         if os.path.exists(self.config_dir):
+            service_values = None
             for config_file in Path(self.config_dir).glob("*.env"):
                 if config_file.name != "common.env":
                     service_name = config_file.stem
-
-                    # 加载特定服务配置时清空环境变量
-                    os.environ.clear()
-                    # 加载服务特定配置
-                    load_dotenv(config_file, override=True)
+                    service_values = read_env_file(config_file, reload=reload)
                     # 提取该服务的配置
-                    self.configs[service_name] = self._load_service_config()
+                    self.configs[service_name] = self._load_service_config(service_values)
 
-    def _load_service_config(self) -> Dict[str, Any]:
+            # 与逐个服务加载时的结果保持一致: 环境变量中只保留最后加载的服务配置
+            if service_values is not None:
+                os.environ.clear()
+                os.environ.update(service_values)
+
+    def _load_service_config(self, service_values: Dict[str, str]) -> Dict[str, Any]:
         """加载特定服务的配置"""
         config = {}
         # 先添加通用配置
         common_keys = ConfigManager.get_common_config_keys()
+        global_config = self.global_config
         for k in common_keys:
-            config[k] = self.global_config[k]
+            config[k] = global_config[k]
 
         # 添加服务特定配置
-        for k, v in os.environ.items():
-            config[k] = v
+        config.update(service_values)
 
         return config
 
@@ -137,6 +216,15 @@ class ConfigManager:
 class EnvFileManager:
     """环境文件管理器"""
 
+    # 配置行: KEY=rest
+    _LINE_RE = re.compile(r'\s*(?P<key>[^=#\s][^=]*?)\s*=(?P<rest>.*)')
+    # 无引号的值及其行内注释: value #comment
+    _UNQUOTED_RE = re.compile(r'(?P<value>.*?)(?: (?P<comment>#.*))?', re.S)
+    # 需要加引号的字符
+    _NEEDS_QUOTE_RE = re.compile(r'[ #,"\'\n\r\t]')
+    # 最近一次写入记录: 文件路径 -> (写入后的 mtime_ns, 写入的配置)
+    _write_cache: Dict[str, tuple[int, Dict[str, Any]]] = {}
+
     @staticmethod
     def update_config(update: Dict[str, Any], env_type: str, env_path: str = None) -> None:
         """更新服务配置文件"""
@@ -158,58 +246,100 @@ class EnvFileManager:
     def update_config_file(update: Dict[str, Any], env_path: str) -> None:
         """通用的配置文件更新方法"""
 
+        # 文件未被改动且写入内容相同时，跳过重复的读取与改写
+        cached = EnvFileManager._write_cache.get(env_path)
+        if cached is not None and os.path.exists(env_path):
+            if cached == (os.stat(env_path).st_mtime_ns, update):
+                return
+
         # 确保目录存在
         Path(env_path).parent.mkdir(parents=True, exist_ok=True)
 
-        # 读取现有内容
+        # 一次性读取现有内容
+        old_data = None
         lines = []
         if os.path.exists(env_path):
-            with open(env_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            with open(env_path, "rb") as f:
+                old_data = f.read()
+            lines = old_data.decode("utf-8").splitlines(keepends=True)
 
         # 更新或添加配置
+        update_keys = frozenset(update)
         updated_keys = set()
         new_lines = []
 
-        # 处理现有行
+        # 单遍处理现有行: 先只匹配键名，只有需要更新的行才继续解析值和注释
         for line in lines:
-            stripped_line = line.strip()
-
-            # 跳过空行和注释行
-            if not stripped_line or stripped_line.startswith("#"):
+            match = EnvFileManager._LINE_RE.fullmatch(line.rstrip('\n\r'))
+            # 空行、注释行、无效行以及无需更新的配置保持原样
+            if match is None or match.group('key') not in update_keys:
                 new_lines.append(line)
                 continue
 
-            # 解析配置行
-            parsed_result = EnvFileManager._parse_config_line(line)
-            if parsed_result:
-                k, v, comment = parsed_result
-
-                if k in update:
-                    # 更新这个配置项
-                    formatted_value = EnvFileManager._format_value(update[k])
-                    if comment:
-                        new_line = f"{k}={formatted_value} {comment}\n"
-                    else:
-                        new_line = f"{k}={formatted_value}\n"
-                    new_lines.append(new_line)
-                    updated_keys.add(k)
-                else:
-                    # 保持原有配置不变
-                    new_lines.append(line)
+            k = match.group('key')
+            _, comment = EnvFileManager._parse_value_and_comment(match.group('rest'))
+            formatted_value = EnvFileManager._format_value(update[k])
+            if comment:
+                new_lines.append(f"{k}={formatted_value} {comment}\n")
             else:
-                # 不是有效的配置行，保持原样
-                new_lines.append(line)
+                new_lines.append(f"{k}={formatted_value}\n")
+            updated_keys.add(k)
 
         # 添加新的配置项
+        if new_lines and not new_lines[-1].endswith(("\n", "\r")):
+            new_lines[-1] += "\n"
         for k, v in update.items():
             if k not in updated_keys:
                 formatted_value = EnvFileManager._format_value(v)
                 new_lines.append(f"{k}={formatted_value}\n")
 
-        # 写入文件
-        with open(env_path, "w", encoding="utf-8") as f:
-            f.writelines(new_lines)
+        # 内容未变化时跳过写入，避免启动时无谓的临时文件替换与 fsync
+        new_data = "".join(new_lines).encode("utf-8")
+        if new_data != old_data:
+            EnvFileManager._atomic_write(env_path, new_data)
+
+            # 文件内容已变化，使缓存失效
+            _DOTENV_CACHE.pop(str(env_path), None)
+
+        EnvFileManager._write_cache[env_path] = (os.stat(env_path).st_mtime_ns, dict(update))
+
+    @staticmethod
+    def _atomic_write(env_path: str, data: bytes) -> None:
+        """先写入同目录临时文件再原子替换，避免写入中途失败导致配置文件被截断"""
+        env_dir = os.path.dirname(os.path.abspath(env_path))
+        fd, temp_path = tempfile.mkstemp(dir=env_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            # 保留原文件权限
+            if os.path.exists(env_path):
+                os.chmod(temp_path, os.stat(env_path).st_mode & 0o777)
+            os.replace(temp_path, env_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        EnvFileManager._fsync_dir(env_dir)
+
+    @staticmethod
+    def _fsync_dir(dir_path: str) -> None:
+        """同步目录项，确保重命名在掉电后依然生效（仅 POSIX）"""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        try:
+            dir_fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            # 部分文件系统不支持对目录 fsync
+            pass
+        finally:
+            os.close(dir_fd)
 
     @staticmethod
     def _parse_config_line(line: str) -> tuple[str, str, str] | None:
@@ -222,21 +352,13 @@ class EnvFileManager:
         - KEY=value # comment
         - KEY="quoted value" # comment
         """
-        line = line.rstrip('\n\r')
-
-        # 必须包含等号
-        if '=' not in line:
-            return None
-
-        # 分离键和值部分
-        key_part, rest = line.split('=', 1)
-        k = key_part.strip()
-
-        if not k:
+        match = EnvFileManager._LINE_RE.fullmatch(line.rstrip('\n\r'))
+        if match is None:
             return None
 
         # 解析值和注释
-        v, comment = EnvFileManager._parse_value_and_comment(rest)
+        k = match.group('key')
+        v, comment = EnvFileManager._parse_value_and_comment(match.group('rest'))
 
         return k, v, comment
 
@@ -261,15 +383,9 @@ class EnvFileManager:
         elif value_part.startswith("'"):
             return EnvFileManager._parse_quoted_value(value_part, "'")
 
-        # 情况2: 无引号的值，查找注释
-        comment_pos = value_part.find(' #')
-        if comment_pos != -1:
-            v = value_part[:comment_pos].strip()
-            comment = value_part[comment_pos:].strip()
-            return v, comment
-
-        # 情况3: 纯值，无注释
-        return value_part, ""
+        # 情况2: 无引号的值，可能带注释
+        match = EnvFileManager._UNQUOTED_RE.fullmatch(value_part)
+        return match.group('value').strip(), match.group('comment') or ""
 
     @staticmethod
     def _parse_quoted_value(value_part: str, quote_char: str) -> tuple[str, str]:
@@ -317,23 +433,23 @@ class EnvFileManager:
             formatted_value = str(v)
 
         # 判断是否需要加引号
-        needs_quotes = any(char in formatted_value for char in ' #,"\'\n\r\t')
-
-        if needs_quotes:
-            # 选择合适的引号字符
-            if '"' in formatted_value and "'" not in formatted_value:
-                return f"'{formatted_value}'"
-            elif "'" in formatted_value and '"' not in formatted_value:
-                return f'"{formatted_value}"'
-            elif '"' in formatted_value and "'" in formatted_value:
-                # 两种引号都有，转义双引号
-                escaped_value = formatted_value.replace('"', '\\"')
-                return f'"{escaped_value}"'
-            else:
-                # 默认使用双引号
-                return f'"{formatted_value}"'
+        if EnvFileManager._NEEDS_QUOTE_RE.search(formatted_value) is None:
+            return formatted_value
+        return EnvFileManager._quote(formatted_value)
 
-        return formatted_value
+    @staticmethod
+    def _quote(formatted_value: str) -> str:
+        """为配置值加上合适的引号"""
+        has_double = '"' in formatted_value
+        has_single = "'" in formatted_value
+        if has_double and not has_single:
+            return f"'{formatted_value}'"
+        elif has_double and has_single:
+            # 两种引号都有，转义双引号
+            escaped_value = formatted_value.replace('"', '\\"')
+            return f'"{escaped_value}"'
+        # 默认使用双引号
+        return f'"{formatted_value}"'
 
 
 if __name__ == '__main__':
@@ -55,7 +55,7 @@ class EnvDistributor:
 
         # 确保 envs 目录存在
         self.envs_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"环境变量分发器初始化完成，envs目录: {self.envs_dir}")
+        logger.info("环境变量分发器初始化完成，envs目录: %s", self.envs_dir)
 
     def distribute_env_vars(self, enabled_services: List[str] = None, env_vars: Dict[str, str] = None):
         """分发环境变量到各服务配置文件
@@ -73,7 +73,7 @@ class EnvDistributor:
             logger.warning("⚠️：可用服务不能缺失！")
             raise "请提供有效的服务。"
 
-        logger.info(f"开始分发环境变量，共 {len(env_vars)} 个变量")
+        logger.info("开始分发环境变量，共 %s 个变量", len(env_vars))
 
         distribution_result = {}
 
@@ -88,9 +88,9 @@ class EnvDistributor:
                 EnvDistributor.update_service_config(service_name, service_vars, env_file_path)
                 distribution_result[service_name] = service_vars
 
-                logger.info(f"服务 {service_name} 分发了 {len(service_vars)} 个配置项")
+                logger.info("服务 %s 分发了 %s 个配置项", service_name, len(service_vars))
             else:
-                logger.debug(f"服务 {service_name} 没有找到相关环境变量")
+                logger.debug("服务 %s 没有找到相关环境变量", service_name)
 
     @staticmethod
     def _extract_service_vars(env_vars: Dict[str, str], service_config: Dict) -> Dict[str, Any]:
@@ -107,7 +107,7 @@ class EnvDistributor:
         # 检查必需变量
         missing_required = service_config['required_vars'] - set(service_vars.keys())
         if missing_required:
-            logger.warning(f"缺少必需的环境变量: {missing_required}")
+            logger.warning("缺少必需的环境变量: %s", missing_required)
 
         return service_vars
 
@@ -115,11 +115,11 @@ class EnvDistributor:
     def update_service_config(service_name: str, service_vars: Dict[str, Any], env_file_path: Path):
         """刷新服务配置文件"""
         try:
-            logger.debug(f"更新 {service_name} 配置文件: {env_file_path}")
+            logger.debug("更新 %s 配置文件: %s", service_name, env_file_path)
             EnvFileManager.update_config_file(service_vars, str(env_file_path))
-            logger.info(f"{service_name} 配置文件更新成功")
+            logger.info("%s 配置文件更新成功", service_name)
         except Exception as e:
-            logger.error(f"更新 {service_name} 配置文件失败: {e}")
+            logger.error("更新 %s 配置文件失败: %s", service_name, e)
             raise
 
     def validate_stdio_config(self, enabled_services: List[str] = None, env_vars: Dict[str, str] = None) -> Dict[
@@ -144,11 +144,11 @@ class EnvDistributor:
         # 验证启动服务列表的有效性
         invalid_services = set(enabled_services) - set(self.SERVICE_ENV_MAPPING.keys())
         if invalid_services:
-            logger.warning(f"未知的服务名称: {invalid_services}")
+            logger.warning("未知的服务名称: %s", invalid_services)
             # 过滤掉无效的服务名
             enabled_services = [s for s in enabled_services if s in self.SERVICE_ENV_MAPPING]
 
-        logger.info(f"验证 {len(enabled_services)} 个启动服务的配置: {enabled_services}")
+        logger.info("验证 %s 个启动服务的配置: %s", len(enabled_services), enabled_services)
 
         validation_result = {}
 
@@ -162,21 +162,17 @@ class EnvDistributor:
             is_valid = len(missing_vars) == 0
             validation_result[service_name] = is_valid
 
-            # 详细的日志信息
-            present_vars = [var for var in required_vars if var in env_vars]
-
+            # 详细的日志信息: 每个服务合并为一条记录
             if missing_vars:
-                logger.warning(f"服务 {service_name} 配置不完整")
-                logger.warning(f"缺少必需参数: {list(missing_vars)}")
-                if present_vars:
-                    logger.info(f"已配置参数: {present_vars}")
+                present_vars = [var for var in required_vars if var in env_vars]
+                logger.warning("服务 %s 配置不完整\n  缺少必需参数: %s\n  已配置参数: %s",
+                               service_name, list(missing_vars), present_vars)
             else:
-                logger.info(f"服务 {service_name} 配置验证通过")
-                logger.debug(f"必需参数: {list(required_vars)}")
+                logger.info("服务 %s 配置验证通过 [必需参数: %s]", service_name, list(required_vars))
 
         # 输出验证汇总
         valid_count = sum(validation_result.values())
         total_count = len(validation_result)
-        logger.info(f"配置验证完成: {valid_count}/{total_count} 个服务配置有效")
+        logger.info("配置验证完成: %s/%s 个服务配置有效", valid_count, total_count)
 
         return validation_result
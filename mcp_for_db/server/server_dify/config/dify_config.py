@@ -1,16 +1,9 @@
 import hashlib
 import os
-from enum import Enum
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from dotenv import load_dotenv
-
-
-class EnvironmentType(Enum):
-    """环境类型"""
-    DEVELOPMENT = 'development'
-    PRODUCTION = 'production'
+from mcp_for_db.server.core.config_manager import EnvironmentType, load_env_file
 
 
 class DiFySessionConfig:
@@ -29,7 +22,7 @@ class DiFySessionConfig:
             # 从环境变量加载
             root_dir = Path(__file__).parent.parent.parent.parent
             diFy_env_file = os.path.join(root_dir, "envs", "dify.env")
-            load_dotenv(diFy_env_file, override=True)
+            load_env_file(diFy_env_file, override=True)
             self.server_config["DIFY_BASE_URL"] = os.getenv('DIFY_BASE_URL')
             self.server_config["DIFY_API_KEY"] = os.getenv('DIFY_API_KEY')
             self.server_config["DIFY_DATASET_ID"] = os.getenv('DIFY_DATASET_ID')
@@ -9,33 +9,42 @@ configure_logger("mcp_session_config.log")
 logger.setLevel(LOG_LEVEL)
 
 # 定义上下文变量
-current_session_config = contextvars.ContextVar("session_config")
+current_session_config = contextvars.ContextVar("dify_session_config")
 
 
 class RequestContext:
-    """异步请求上下文管理器"""
+    """请求上下文管理器，同时支持 with 与 async with"""
 
     def __init__(self, session_config: DiFySessionConfig):
         self.session_config = session_config
         self._session_token = None
 
-    async def __aenter__(self):
-        """进入异步上下文"""
+    def __enter__(self):
+        """进入上下文"""
         self._session_token = current_session_config.set(self.session_config)
         logger.debug("请求上下文设置完成")
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """退出异步上下文，确保资源释放"""
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """退出上下文，确保资源释放"""
         if self._session_token:
             current_session_config.reset(self._session_token)
         self._session_token = None
         logger.debug("请求上下文已重置")
 
+    async def __aenter__(self):
+        """进入异步上下文"""
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """退出异步上下文"""
+        self.__exit__(exc_type, exc_val, exc_tb)
+
+
+# 预先绑定 ContextVar.get，热路径上省去属性查找；传入默认值时 get 不会抛出 LookupError
+_get_session_config = current_session_config.get
+
 
 def get_current_session_config() -> Optional[DiFySessionConfig]:
     """获取当前请求的会话配置"""
-    try:
-        return current_session_config.get(None)
-    except LookupError:
-        return None
+    return _get_session_config(None)
@@ -1,11 +1,9 @@
-import json
-
 import aiohttp
 from typing import Optional
 
 from mcp_for_db import LOG_LEVEL
 from mcp_for_db.server.server_dify.config import get_current_session_config
-from mcp_for_db.server.shared.utils import get_logger, configure_logger
+from mcp_for_db.server.shared.utils import get_logger, configure_logger, json_loads
 
 logger = get_logger(__name__)
 configure_logger(log_filename="mcp_tools_dify_knowledge.log")
@@ -75,7 +73,11 @@ class DiFyKnowledgeBaseTool:
                     return await response.json()
                 elif response.status == 400:
                     error_text = await response.text()
-                    error_data = json.loads(error_text) if error_text else {}
+                    try:
+                        error_data = json_loads(error_text) if error_text else {}
+                    except ValueError:
+                        # 错误响应不是 JSON（如网关返回的 HTML）
+                        error_data = {}
                     error_message = error_data.get("message", "")
 
                     # 检查是否是向量索引相关错误
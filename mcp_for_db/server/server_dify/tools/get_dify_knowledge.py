@@ -76,7 +76,7 @@ class RetrieveKnowledge(BaseHandler):
             search_method = arguments.get("search_method", "auto")
             include_raw_results = arguments.get("include_raw_results", False)
 
-            logger.info(f"开始检索数据库知识库 - 用户查询: {user_query}")
+            logger.info("开始检索数据库知识库 - 用户查询: %s", user_query)
 
             # 执行知识库检索
             retrieval_result = await self._perform_knowledge_retrieval(
@@ -105,11 +105,11 @@ class RetrieveKnowledge(BaseHandler):
                 raw_results_text = f"\n\n---\n## 🔧 原始检索结果 (调试信息)\n```json\n{json.dumps(retrieval_result, ensure_ascii=False, indent=2)}\n```"
                 results.append(TextContent(type="text", text=raw_results_text))
 
-            logger.info(f"成功生成DBA专业提示词 - 检索片段数: {len(rag_context.retrieved_segments)}")
+            logger.info("成功生成DBA专业提示词 - 检索片段数: %s", len(rag_context.retrieved_segments))
             return results
 
         except Exception as e:
-            logger.error(f"生成DBA提示词时出错: {str(e)}", exc_info=True)
+            logger.error("生成DBA提示词时出错: %s", e, exc_info=True)
             error_prompt = f"""# ⚠️ 服务异常
                     抱歉，在处理您的数据库问题时遇到技术故障：
                     
@@ -189,7 +189,7 @@ class RetrieveKnowledge(BaseHandler):
             return formatted_result
 
         except Exception as e:
-            logger.error(f"知识库检索失败: {str(e)}")
+            logger.error("知识库检索失败: %s", e)
             return {
                 "状态": "检索失败",
                 "错误": str(e)
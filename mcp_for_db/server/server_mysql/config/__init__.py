@@ -1,11 +1,15 @@
-from .session_config import SessionConfigManager
+from .session_config import SessionConfigManager, BLOCKED_MATCH_SUBSTRING, BLOCKED_MATCH_WORD, BLOCKED_MATCH_REGEX
 from .database import DatabaseManager
-from .request_context import RequestContext, get_current_database_manager, get_current_session_config
+from .request_context import RequestContext, request_context, get_current_database_manager, get_current_session_config
 
 __all__ = [
     "SessionConfigManager",
+    "BLOCKED_MATCH_SUBSTRING",
+    "BLOCKED_MATCH_WORD",
+    "BLOCKED_MATCH_REGEX",
     "DatabaseManager",
     "RequestContext",
+    "request_context",
     "get_current_session_config",
     "get_current_database_manager",
 ]
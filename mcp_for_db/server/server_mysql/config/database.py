@@ -1,7 +1,9 @@
+import logging
 import weakref
 import aiomysql
 import asyncio
 import hashlib
+import json
 import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Optional, Dict, Any, List, Union
@@ -20,6 +22,14 @@ configure_logger(log_filename="mcp_database.log")
 logger.setLevel(LOG_LEVEL)
 
 
+# execute_query 中强制阻止的操作类型
+HARD_BLOCK_OPERATIONS = frozenset({'DROP', 'TRUNCATE', 'ALTER', 'RENAME', 'LOCK', 'DELETE', 'UPDATE'})
+# 安全游标中强制阻止的操作类型
+CURSOR_BLOCK_OPERATIONS = frozenset({'DROP', 'TRUNCATE', 'ALTER', 'RENAME', 'LOCK', 'DELETE'})
+# 会改变连接会话状态的操作类型，共享连接池中的连接执行后不再归还给其他会话
+SESSION_STATE_OPERATIONS = frozenset({'USE', 'SET', 'BEGIN', 'START'})
+
+
 class DatabaseConnectionState(Enum):
     """数据库连接状态枚举"""
     UNINITIALIZED = 0
@@ -44,12 +54,19 @@ class DatabaseManager:
     # 跟踪所有实例
     _all_instances = weakref.WeakSet()
 
-    def __init__(self, session_config: SessionConfigManager):
+    # ensure_pool 的状态转换表: 状态 -> 需要执行的方法名，未列出的状态无需任何操作
+    _STATE_TRANSITIONS = {
+        DatabaseConnectionState.UNINITIALIZED: "initialize_pool",
+        DatabaseConnectionState.CLOSED: "initialize_pool",
+    }
+
+    def __init__(self, session_config: SessionConfigManager, shared_manager: Optional["DatabaseManager"] = None):
         """
         初始化数据库管理器
 
         Args:
             session_config: 会话配置管理器实例
+            shared_manager: 持有服务级共享连接池的管理器，连接配置一致时借用其连接池
         """
         self.session_config = session_config
         self._pool = None
@@ -58,6 +75,16 @@ class DatabaseManager:
         self._successful_auth_plugin = None
         self._last_connection_time = 0
         self._reconnect_attempts = 0
+        # 服务级共享连接池的持有者；连接配置与之不同（如切换数据库后）时创建私有连接池
+        self._shared_manager = shared_manager
+        # 当前连接池是否借用自 _shared_manager，借用的连接池关闭时只归还不销毁
+        self._borrowed = False
+        # 正在借用本管理器连接池的会话数量
+        self._borrowers = 0
+        # 通过 async with 持有连接池的使用方数量，只有最外层使用方释放时才关闭连接池
+        self._refcount = 0
+        # 串行化连接池状态转换，避免并发请求重复初始化
+        self._init_lock = asyncio.Lock()
 
         # 初始化安全组件
         self.sql_parser = SQLParser(session_config)
@@ -75,19 +102,85 @@ class DatabaseManager:
 
     @classmethod
     async def close_all_instances(cls):
-        """关闭所有数据库管理器实例的连接池"""
+        """关闭所有数据库管理器实例的连接池，不受引用计数影响"""
         logger.info("关闭所有数据库连接池...")
         for instance in list(cls._all_instances):
             try:
-                await instance.close_pool()
+                await instance._close_pool()
             except Exception as e:
-                logger.error(f"关闭数据库连接池失败: {str(e)}")
+                logger.error("关闭数据库连接池失败: %s", e)
+
+    async def _borrow_shared_pool(self) -> bool:
+        """连接配置与服务级共享连接池一致时借用该连接池，无需新建连接"""
+        shared = self._shared_manager
+        if shared is None or self._compute_config_hash(shared.get_current_config()) != self._config_hash:
+            return False
+
+        # 服务启动时未能连接的共享连接池在此重试
+        if shared.state is DatabaseConnectionState.ERROR:
+            await shared.reconnect()
+        await shared.ensure_pool()
+        if not shared.is_healthy():
+            raise RuntimeError("共享数据库连接池不可用")
+
+        shared._borrowers += 1
+        self._pool = shared._pool
+        self._borrowed = True
+        self._state = DatabaseConnectionState.ACTIVE
+        self._last_connection_time = time.time()
+        self._reconnect_attempts = 0
+        return True
+
+    def _return_shared_pool(self) -> None:
+        """归还借用的共享连接池，连接池由其持有者关闭"""
+        self._shared_manager._borrowers -= 1
+        self._borrowed = False
+        self._pool = None
+        self._state = DatabaseConnectionState.CLOSED
+
+    async def __aenter__(self) -> "DatabaseManager":
+        """持有连接池: 增加引用计数并确保连接池可用
+
+        应用层应使用 ``async with database_manager:`` 持有连接池，而不是自行调用 initialize_pool
+        """
+        self._refcount += 1
+        try:
+            await self.ensure_pool()
+        except Exception:
+            self._refcount -= 1
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """释放连接池: 只有最外层使用方退出时才关闭"""
+        await self.close_pool()
+
+    async def reset(self) -> None:
+        """连接配置变更时强制重建连接池，不受引用计数影响（initialize_pool 会先关闭现有连接池）"""
+        await self.initialize_pool()
 
     async def close_pool(self) -> None:
+        """释放连接池，仍有外层使用方持有时只减少引用计数"""
+        if self._refcount > 0:
+            self._refcount -= 1
+            if self._refcount > 0:
+                logger.debug("连接池仍被 %d 个使用方持有，暂不关闭", self._refcount)
+                return
+        await self._close_pool()
+
+    async def _close_pool(self) -> None:
         """安全关闭数据库连接池"""
         if not self._pool or self._state in (DatabaseConnectionState.CLOSED, DatabaseConnectionState.UNINITIALIZED):
             return
 
+        # 借用的共享连接池只归还引用，不关闭连接
+        if self._borrowed:
+            self._return_shared_pool()
+            logger.debug("已归还共享数据库连接池")
+            return
+
+        if self._borrowers:
+            logger.warning("关闭数据库连接池时仍有 %d 个会话在借用", self._borrowers)
         logger.info("关闭数据库连接池...")
         try:
             # 检查事件循环状态
@@ -112,11 +205,11 @@ class DatabaseManager:
                 logger.warning("事件循环已关闭，直接关闭连接池")
                 self._pool.close()
             else:
-                logger.warning(f"连接池关闭时发生运行时错误: {str(e)}")
+                logger.warning("连接池关闭时发生运行时错误: %s", e)
         except asyncio.CancelledError:
             logger.warning("连接池关闭操作被取消")
         except Exception as e:
-            logger.exception(f"关闭连接池时出错: {str(e)}")
+            logger.exception("关闭连接池时出错: %s", e)
         finally:
             self._pool = None
             self._state = DatabaseConnectionState.CLOSED
@@ -128,11 +221,14 @@ class DatabaseManager:
 
     async def ensure_pool(self) -> None:
         """确保连接池已初始化并可用"""
-        if self._state in (DatabaseConnectionState.ACTIVE, DatabaseConnectionState.ERROR):
+        if self._state not in self._STATE_TRANSITIONS:
             return
 
-        if self._state in (DatabaseConnectionState.UNINITIALIZED, DatabaseConnectionState.CLOSED):
-            await self.initialize_pool()
+        async with self._init_lock:
+            # 拿到锁后按最新状态查表，其他协程可能已完成初始化
+            action = self._STATE_TRANSITIONS.get(self._state)
+            if action:
+                await getattr(self, action)()
 
     async def initialize_pool(self, max_retries: int = 3) -> None:
         """
@@ -142,7 +238,7 @@ class DatabaseManager:
             max_retries: 最大重试次数
         """
         # 关闭现有连接池
-        await self.close_pool()
+        await self._close_pool()
 
         logger.info("初始化数据库连接池...")
 
@@ -155,12 +251,18 @@ class DatabaseManager:
             self._config_hash = new_hash
             logger.info("检测到配置变更，使用新配置初始化连接池")
 
+        # 连接配置与服务级共享连接池一致时直接借用
+        if await self._borrow_shared_pool():
+            logger.debug("借用共享数据库连接池")
+            return
+
         # 构建连接参数
         connection_params = self._build_connection_params()
 
-        # 记录安全的配置信息（不含密码）
-        safe_config = {k: v for k, v in connection_params.items() if k != "password"}
-        logger.debug(f"连接参数: {safe_config}")
+        # 记录安全的配置信息（不含密码），未开启 DEBUG 时跳过构造
+        if logger.isEnabledFor(logging.DEBUG):
+            safe_config = {k: v for k, v in connection_params.items() if k != "password"}
+            logger.debug("连接参数: %s", safe_config)
 
         try:
             # 首次尝试连接
@@ -172,7 +274,7 @@ class DatabaseManager:
             return
         except aiomysql.OperationalError as e:
             error_msg = str(e).lower()
-            logger.warning(f"数据库连接异常: {e}")
+            logger.warning("数据库连接异常: %s", e)
 
             # 如果是认证问题且设置了重试，则尝试不同认证方式
             if "plugin" in error_msg and max_retries > 0:
@@ -183,7 +285,7 @@ class DatabaseManager:
                 self._handle_connection_error(e)
                 raise
         except Exception as e:
-            logger.exception(f"数据库连接池初始化失败: {e}")
+            logger.exception("数据库连接池初始化失败: %s", e)
             self._state = DatabaseConnectionState.ERROR
             self._handle_connection_error(e)
             raise
@@ -205,9 +307,14 @@ class DatabaseManager:
             "DB_POOL_MAX_SIZE": self.session_config.get("MYSQL_DB_POOL_MAX_SIZE", 20),
         }
 
-    def _compute_config_hash(self, config: Dict[str, Any]) -> str:
-        """计算配置哈希值用于标识配置变更"""
-        return hashlib.md5(str(config).encode('utf-8')).hexdigest()
+    @staticmethod
+    def _compute_config_hash(config: Dict[str, Any]) -> str:
+        """计算配置哈希值用于标识配置变更
+
+        按键排序序列化，保证同样的配置总是得到同样的哈希
+        """
+        payload = json.dumps(config, sort_keys=True, default=str, separators=(',', ':')).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
     def _build_connection_params(self) -> Dict[str, Any]:
         """构建连接参数"""
@@ -221,20 +328,40 @@ class DatabaseManager:
             "minsize": self.session_config.get("MYSQL_DB_POOL_MIN_SIZE", 5),
             "maxsize": self.session_config.get("MYSQL_DB_POOL_MAX_SIZE", 20),
             "charset": "utf8mb4",
-            "cursorclass": aiomysql.DictCursor,
             "connect_timeout": self.session_config.get("MYSQL_DB_CONNECTION_TIMEOUT", 5),
             "auth_plugin": self._successful_auth_plugin or self.session_config.get("MYSQL_DB_AUTH_PLUGIN",
                                                                                    "mysql_native_password")
         }
 
+    @staticmethod
+    async def _detect_auth_plugin(params: Dict[str, Any]) -> Optional[str]:
+        """使用单个连接自动协商，返回服务器实际使用的认证插件"""
+        probe_params = {k: v for k, v in params.items() if k not in ("auth_plugin", "minsize", "maxsize")}
+        try:
+            conn = await aiomysql.connect(**probe_params)
+        except Exception as e:
+            logger.warning("认证插件探测失败: %s", e)
+            return None
+
+        try:
+            return getattr(conn, "_auth_plugin_used", None) or getattr(conn, "_server_auth_plugin", None) or None
+        finally:
+            conn.close()
+
     async def _try_alternative_auth(self, params: Dict[str, Any], max_retries: int) -> None:
         """尝试不同的认证方式"""
-        plugins = [
-            None,  # 自动协商
-            "mysql_native_password",
-            "caching_sha2_password",
-            "sha256_password"
-        ]
+        # 先探测服务器使用的认证插件，命中时只需一次建池，避免逐个插件握手
+        detected_plugin = await self._detect_auth_plugin(params)
+        if detected_plugin:
+            logger.info("探测到服务器认证插件: %s", detected_plugin)
+            plugins = [detected_plugin]
+        else:
+            plugins = [
+                None,  # 自动协商
+                "mysql_native_password",
+                "caching_sha2_password",
+                "sha256_password"
+            ]
 
         for plugin in plugins:
             try:
@@ -245,10 +372,10 @@ class DatabaseManager:
                 elif "auth_plugin" in new_params:
                     del new_params["auth_plugin"]
 
-                logger.info(f"尝试认证插件: {plugin or 'auto'}")
+                logger.info("尝试认证插件: %s", plugin or 'auto')
                 self._pool = await aiomysql.create_pool(**new_params)
 
-                logger.info(f"使用插件 {plugin or 'auto'} 连接成功")
+                logger.info("使用插件 %s 连接成功", plugin or 'auto')
                 self._state = DatabaseConnectionState.ACTIVE
                 self._successful_auth_plugin = plugin
                 self._last_connection_time = time.time()
@@ -259,7 +386,7 @@ class DatabaseManager:
                     self.session_config.update({"MYSQL_DB_AUTH_PLUGIN": plugin})
                 return
             except Exception as e:
-                logger.warning(f"插件 {plugin} 失败: {str(e)}")
+                logger.warning("插件 %s 失败: %s", plugin, e)
                 max_retries -= 1
                 if max_retries <= 0:
                     break
@@ -277,17 +404,17 @@ class DatabaseManager:
             logger.error("访问被拒绝，请检查用户名和密码")
         elif "unknown database" in error_msg:
             db_name = self.session_config.get("MYSQL_DATABASE")
-            logger.error(f"数据库 '{db_name}' 不存在")
+            logger.error("数据库 '%s' 不存在", db_name)
         elif "can't connect" in error_msg or "connection refused" in error_msg:
             logger.error("无法连接到MySQL服务器，请检查服务是否启动")
         elif "authentication plugin" in error_msg:
             current_auth = self.session_config.get("MYSQL_DB_AUTH_PLUGIN")
-            logger.error(f"认证插件问题: {error_msg}")
+            logger.error("认证插件问题: %s", error_msg)
             if current_auth == 'caching_sha2_password':
                 logger.error("解决方案:")
                 logger.error("1. 确保已安装 cryptography 包: pip install cryptography")
                 logger.error("2. 或者修改用户认证方式为 mysql_native_password")
-                logger.error(f"3. 在配置中设置 DB_AUTH_PLUGIN=mysql_native_password")
+                logger.error("3. 在配置中设置 DB_AUTH_PLUGIN=mysql_native_password")
 
         # 增加重连尝试计数
         self._reconnect_attempts += 1
@@ -332,8 +459,10 @@ class DatabaseManager:
                             operation = parsed_sql['operation_type'].upper()
 
                             # 硬阻止高危操作
-                            if operation in {'DROP', 'TRUNCATE', 'ALTER', 'RENAME', 'LOCK', "DELETE"}:
+                            if operation in CURSOR_BLOCK_OPERATIONS:
                                 raise SecurityException(f"高危操作 {operation} 被强制阻止")
+                            if operation in SESSION_STATE_OPERATIONS:
+                                conn.session_changed = True
 
                             # 执行原始操作
                             if params:
@@ -346,13 +475,19 @@ class DatabaseManager:
 
                 # 返回安全包装后的连接
                 conn.safe_cursor = safe_cursor
-                yield conn
+                conn.session_changed = False
+                try:
+                    yield conn
+                finally:
+                    # 共享连接池的连接会被其他会话复用，改变过会话状态（USE、SET 等）的连接直接关闭，不再归还
+                    if conn.session_changed and self._borrowed:
+                        conn.close()
         except aiomysql.Error as e:
-            logger.error(f"获取数据库连接失败: {str(e)}")
+            logger.error("获取数据库连接失败: %s", e)
             self._handle_connection_error(e)
             raise
         except Exception as e:
-            logger.exception(f"获取数据库连接时发生未预期错误: {str(e)}")
+            logger.exception("获取数据库连接时发生未预期错误: %s", e)
             raise
 
     ###################################################################################################################
@@ -387,16 +522,15 @@ class DatabaseManager:
             operation = parsed_sql['operation_type']
 
             # 硬阻止高危操作
-            HARD_BLOCK_OPS = {'DROP', 'TRUNCATE', 'ALTER', 'RENAME', 'LOCK', 'DELETE', 'UPDATE'}
-            if operation in HARD_BLOCK_OPS:
+            if operation in HARD_BLOCK_OPERATIONS:
                 raise SecurityException(f"高危操作 {operation} 被强制阻止 - 此操作不可执行")
 
-            # 安全检查
-            await self.sql_interceptor.check_operation(sql_query)
+            # 安全检查（复用上面的解析结果）
+            await self.sql_interceptor.check_operation(sql_query, parsed_sql)
 
             # 数据库范围检查
             if self.database_checker:
-                self.database_checker.enforce_query(sql_query)
+                await self.database_checker.enforce_query_async(sql_query)
 
             # 解析SQL以获取操作类型和表名
             category = parsed_sql['category']
@@ -405,6 +539,8 @@ class DatabaseManager:
                 # 创建游标
                 async with conn.cursor(aiomysql.DictCursor) as cursor:
                     # 执行查询
+                    if operation in SESSION_STATE_OPERATIONS:
+                        conn.session_changed = True
                     if params:
                         await cursor.execute(sql_query, params)
                     else:
@@ -435,18 +571,18 @@ class DatabaseManager:
                     ", ".join(parsed_sql['tables'])
                 )
             else:
-                logger.exception(f"查询执行失败: {str(e)}")
+                logger.exception("查询执行失败: %s", e)
                 raise
         except SecurityException as se:
-            logger.error(f"安全拦截: {se.message}")
+            logger.error("安全拦截: %s", se.message)
             raise
         except DatabaseScopeViolation as dve:
-            logger.error(f"数据库范围违规: {dve.message}")
+            logger.error("数据库范围违规: %s", dve.message)
             for violation in dve.violations:
-                logger.error(f" - {violation}")
+                logger.error(" - %s", violation)
             raise
         except Exception as e:
-            logger.exception(f"查询执行失败: {str(e)}")
+            logger.exception("查询执行失败: %s", e)
             raise
         finally:
             # 记录查询性能
@@ -467,10 +603,9 @@ class DatabaseManager:
         Returns:
             增强后的结果列表
         """
+        # 行数据由 DictCursor 生成，每行都是独立的字典，直接原地增强，无需再复制
         enhanced = []
-        for row in results:
-            row_dict = dict(row)
-
+        for row_dict in results:
             # 对特定元数据查询进行增强
             if operation == 'SHOW':
                 # 检查是否是 SHOW TABLES 结果
@@ -511,7 +646,8 @@ class DatabaseManager:
         if not results:
             return [{'operation': operation, 'result_count': 0}]
 
-        return [dict(row) for row in results]
+        # DictCursor 已将每行转换为字典，直接返回，避免再次逐行复制
+        return list(results)
 
     def _process_dml_result(self, affected_rows: int, sql_query: str, operation: str) -> List[Dict[str, Any]]:
         """
@@ -525,7 +661,7 @@ class DatabaseManager:
         Returns:
             结果字典列表
         """
-        logger.debug(f"{operation} 操作影响了 {affected_rows} 行数据")
+        logger.debug("%s 操作影响了 %s 行数据", operation, affected_rows)
         return [{"operation": operation, "affected_rows": affected_rows}]
 
     async def execute_transaction(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -575,11 +711,11 @@ class DatabaseManager:
 
         # 根据执行时间确定日志级别
         if execution_time >= 1.0:  # 超过1秒的查询记录为警告
-            logger.warning(f"慢查询 [{operation}]: {truncated_query} 执行时间: {execution_time:.4f}秒")
+            logger.warning("慢查询 [%s]: %s 执行时间: %.4f秒", operation, truncated_query, execution_time)
         elif execution_time >= 0.5:  # 超过0.5秒的查询记录为提醒
-            logger.info(f"较慢查询 [{operation}]: {truncated_query} 执行时间: {execution_time:.4f}秒")
+            logger.info("较慢查询 [%s]: %s 执行时间: %.4f秒", operation, truncated_query, execution_time)
         else:
-            logger.debug(f"查询 [{operation}] 执行时间: {execution_time:.4f}秒")
+            logger.debug("查询 [%s] 执行时间: %.4f秒", operation, execution_time)
 
     def is_healthy(self) -> bool:
         """检查连接池是否健康"""
@@ -597,7 +733,7 @@ class DatabaseManager:
             await self.initialize_pool()
             logger.info("数据库重新连接成功")
         except Exception as e:
-            logger.error(f"数据库重新连接失败: {str(e)}")
+            logger.error("数据库重新连接失败: %s", e)
             self._state = DatabaseConnectionState.ERROR
 
     async def get_database_info(self) -> Dict[str, Any]:
@@ -613,7 +749,7 @@ class DatabaseManager:
                 "reconnect_attempts": self._reconnect_attempts
             }
         except Exception as e:
-            logger.error(f"获取数据库信息失败: {str(e)}")
+            logger.error("获取数据库信息失败: %s", e)
             return {
                 "error": str(e),
                 "status": self._state.name
@@ -632,7 +768,7 @@ class DatabaseManager:
                 return result[0]['db'] or ""
             return ""
         except Exception as e:
-            logger.error(f"获取当前数据库名称失败: {str(e)}")
+            logger.error("获取当前数据库名称失败: %s", e)
             return ""
 
 
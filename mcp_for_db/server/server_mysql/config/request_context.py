@@ -1,5 +1,6 @@
+import contextlib
 import contextvars
-from typing import Optional
+from typing import Optional, Iterator
 
 from mcp_for_db import LOG_LEVEL
 from mcp_for_db.server.server_mysql.config import SessionConfigManager, DatabaseManager
@@ -14,44 +15,64 @@ current_session_config = contextvars.ContextVar("session_config")
 current_database_manager = contextvars.ContextVar("database_manager")
 
 
+@contextlib.contextmanager
+def request_context(session_config: SessionConfigManager, db_manager: DatabaseManager) -> Iterator[None]:
+    """轻量请求上下文: 直接设置并重置上下文变量，无需创建 RequestContext 对象
+
+    同步、异步代码中均可使用 ``with request_context(cfg, dbm): ...``
+    """
+    session_token = current_session_config.set(session_config)
+    db_token = current_database_manager.set(db_manager)
+    try:
+        yield
+    finally:
+        current_database_manager.reset(db_token)
+        current_session_config.reset(session_token)
+
+
 class RequestContext:
-    """异步请求上下文管理器"""
+    """请求上下文管理器，同时支持 with 与 async with，上下文变量的设置与重置委托给 request_context"""
 
     def __init__(self, session_config: SessionConfigManager, db_manager: DatabaseManager):
         self.session_config = session_config
         self.db_manager = db_manager
-        self._session_token = None
-        self._db_token = None
+        self._context = None
 
-    async def __aenter__(self):
-        """进入异步上下文"""
-        self._session_token = current_session_config.set(self.session_config)
-        self._db_token = current_database_manager.set(self.db_manager)
+    def __enter__(self):
+        """进入上下文"""
+        self._context = request_context(self.session_config, self.db_manager)
+        self._context.__enter__()
         logger.debug("请求上下文设置完成")
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """退出异步上下文，确保资源释放"""
-        if self._session_token:
-            current_session_config.reset(self._session_token)
-        if self._db_token:
-            current_database_manager.reset(self._db_token)
-        self._session_token = None
-        self._db_token = None
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """退出上下文，确保资源释放"""
+        context, self._context = self._context, None
+        if context is not None:
+            context.__exit__(exc_type, exc_val, exc_tb)
         logger.debug("请求上下文已重置")
 
+    async def __aenter__(self):
+        """进入异步上下文"""
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """退出异步上下文: 归还借用的共享连接池，或关闭切换数据库后创建的私有连接池"""
+        self.__exit__(exc_type, exc_val, exc_tb)
+        if self.db_manager is not None:
+            await self.db_manager.close_pool()
+
+
+# 预先绑定 ContextVar.get，热路径上省去属性查找；传入默认值时 get 不会抛出 LookupError
+_get_session_config = current_session_config.get
+_get_database_manager = current_database_manager.get
+
 
 def get_current_session_config() -> Optional[SessionConfigManager]:
     """获取当前请求的会话配置"""
-    try:
-        return current_session_config.get(None)
-    except LookupError:
-        return None
+    return _get_session_config(None)
 
 
 def get_current_database_manager() -> Optional[DatabaseManager]:
     """获取当前请求的数据库管理器"""
-    try:
-        return current_database_manager.get(None)
-    except LookupError:
-        return None
+    return _get_database_manager(None)
@@ -1,16 +1,55 @@
 import os
+import re
+import sys
 import hashlib
+import functools
 from pathlib import Path
-from typing import Set, Dict, Any, Optional, List, Callable
+from types import MappingProxyType
+from typing import Set, Dict, Any, Optional, Callable, Mapping, FrozenSet, Tuple, Pattern
 from dataclasses import dataclass
-from dotenv import load_dotenv
-from mcp_for_db.server.core import EnvironmentType, SQLRiskLevel, DatabaseAccessLevel, strtobool
+from mcp_for_db import LOG_LEVEL
+from mcp_for_db.server.core import EnvironmentType, SQLRiskLevel, DatabaseAccessLevel, strtobool, load_env_file
+from mcp_for_db.server.shared.utils import get_logger, configure_logger
+
+try:
+    import xxhash  # 可选依赖: 更快的非加密哈希
+except ImportError:
+    xxhash = None
+
+logger = get_logger(__name__)
+configure_logger("mcp_session_config.log")
+logger.setLevel(LOG_LEVEL)
 
 """
 该脚本主要接收 ConfigManager 类分发来的关于 MYSQL 的一些配置信息的格式化处理，如果没有则加载默认配置的 mysql.env 配置
 """
 
 
+# 风险等级查找表
+_RISK_BY_NAME = {level.name: level for level in SQLRiskLevel}
+_RISK_BY_VALUE = {level.value: level for level in SQLRiskLevel}
+# 访问级别、环境类型的合法取值
+_ACCESS_LEVEL_VALUES = frozenset(level.value for level in DatabaseAccessLevel)
+_ENV_TYPE_VALUES = frozenset(env.value for env in EnvironmentType)
+# 默认阻止模式
+_DEFAULT_BLOCKED_PATTERNS = ('DROP TABLE', 'DROP DATABASE', 'DELETE FROM', 'TRUNCATE TABLE', 'ALTER TABLE',
+                             'CREATE TABLE', 'DROP INDEX')
+
+# 阻止模式的匹配方式（均不区分大小写）
+BLOCKED_MATCH_SUBSTRING = 'substring'  # 按字面子串匹配
+BLOCKED_MATCH_WORD = 'word'  # 按字面匹配，且须是独立的单词
+BLOCKED_MATCH_REGEX = 'regex'  # 模式本身作为正则表达式匹配
+
+
+def _to_enum(enum_cls, v: Any, default):
+    """按取值查找枚举成员，直接查 _value2member_map_，避免 Enum.__call__ 的开销"""
+    if not isinstance(v, str):
+        if isinstance(v, enum_cls):
+            return v
+        v = str(v)
+    return enum_cls._value2member_map_.get(v.lower().strip(), default)
+
+
 @dataclass
 class ConfigSchema:
     """配置模式定义"""
@@ -37,59 +76,93 @@ class ConfigNormalizer:
         'blocked_patterns': lambda x: ConfigNormalizer._parse_blocked_patterns(x)
     }
 
+    # 判断值是否已是标准化结果，命中时无需再转换
+    NORMALIZED_CHECKS = {
+        'bool': lambda x: isinstance(x, bool),
+        'int': lambda x: type(x) is int,
+        'float': lambda x: type(x) is float,
+        'str': lambda x: type(x) is str and x == x.strip().strip('\'"'),
+        'list': lambda x: isinstance(x, list),
+        'risk_levels': lambda x: isinstance(x, set) and bool(x) and all(isinstance(i, SQLRiskLevel) for i in x),
+        'access_level': lambda x: x in _ACCESS_LEVEL_VALUES,
+        'env_type': lambda x: x in _ENV_TYPE_VALUES,
+        'blocked_patterns': lambda x: isinstance(x, tuple) and bool(x) and all(
+            type(p) is str and p == p.strip().upper() and p for p in x)
+    }
+
     @staticmethod
     def _parse_risk_levels(levels_str: str) -> Set[SQLRiskLevel]:
-        """解析风险等级字符串"""
+        """解析风险等级字符串，支持名称（LOW）或数值（1）"""
+        # 解析结果按输入字符串缓存，返回可变副本供调用方修改
+        return set(ConfigNormalizer._parse_risk_levels_cached(levels_str))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _parse_risk_levels_cached(levels_str: str) -> FrozenSet[SQLRiskLevel]:
+        """解析风险等级字符串（带缓存）"""
         if not levels_str:
-            return {SQLRiskLevel.LOW}
+            return frozenset({SQLRiskLevel.LOW})
 
         allowed_levels = set()
         for level_str in levels_str.upper().split(','):
             level_str = level_str.strip()
-            try:
-                # 确保返回SQLRiskLevel枚举对象，而不是字符串
-                if hasattr(SQLRiskLevel, level_str):
-                    allowed_levels.add(getattr(SQLRiskLevel, level_str))
-            except AttributeError:
-                continue
-        return allowed_levels or {SQLRiskLevel.LOW}
+            # 确保返回SQLRiskLevel枚举对象，而不是字符串
+            level = _RISK_BY_NAME.get(level_str)
+            if level is None and level_str.isdigit():
+                level = _RISK_BY_VALUE.get(int(level_str))
+            if level is not None:
+                allowed_levels.add(level)
+        return frozenset(allowed_levels or {SQLRiskLevel.LOW})
 
     @staticmethod
     def _parse_access_level(v: Any) -> str:
         """解析数据库访问级别"""
-        try:
-            return DatabaseAccessLevel(str(v).lower().strip()).value
-        except (ValueError, AttributeError):
-            return DatabaseAccessLevel.PERMISSIVE.value
+        return _to_enum(DatabaseAccessLevel, v, DatabaseAccessLevel.PERMISSIVE).value
 
     @staticmethod
     def _parse_env_type(v: Any) -> str:
         """解析环境类型"""
-        try:
-            env_str = str(v).lower().strip()
-            if env_str in ('development', 'production', 'testing'):
-                return EnvironmentType(env_str).value
-            return EnvironmentType.DEVELOPMENT.value
-        except (ValueError, AttributeError):
-            return EnvironmentType.DEVELOPMENT.value
+        return _to_enum(EnvironmentType, v, EnvironmentType.DEVELOPMENT).value
 
     @staticmethod
-    def _parse_blocked_patterns(v: Any) -> List[str]:
-        """解析阻止模式"""
+    def _parse_blocked_patterns(v: Any) -> Tuple[str, ...]:
+        """解析阻止模式，结果为不可变元组，可在会话间共享而无需复制"""
         if isinstance(v, str):
-            v = v.strip('\'"')
-            if not v:
-                return ConfigNormalizer._get_default_blocked_patterns()
-            return [p.strip().upper() for p in v.split(',') if p.strip()]
-        elif isinstance(v, list):
-            patterns = [str(p).strip().upper() for p in v if str(p).strip()]
+            return ConfigNormalizer._parse_blocked_patterns_cached(v)
+        elif isinstance(v, (list, tuple, set, frozenset)):
+            patterns = ConfigNormalizer._clean_patterns(str(p) for p in v)
             return patterns if patterns else ConfigNormalizer._get_default_blocked_patterns()
         return ConfigNormalizer._get_default_blocked_patterns()
 
     @staticmethod
-    def _get_default_blocked_patterns() -> List[str]:
-        return ['DROP TABLE', 'DROP DATABASE', 'DELETE FROM', 'TRUNCATE TABLE', 'ALTER TABLE', 'CREATE TABLE',
-                'DROP INDEX']
+    @functools.lru_cache(maxsize=64)
+    def _parse_blocked_patterns_cached(v: str) -> Tuple[str, ...]:
+        """解析字符串形式的阻止模式（带缓存）"""
+        v = v.strip('\'"')
+        if not v:
+            return ConfigNormalizer._get_default_blocked_patterns()
+        return ConfigNormalizer._clean_patterns(v.split(','))
+
+    @staticmethod
+    def _clean_patterns(items) -> Tuple[str, ...]:
+        """去除空白并转为大写，每个模式只 strip 一次"""
+        out = []
+        append = out.append
+        for p in items:
+            p = p.strip()
+            if p:
+                append(p.upper())
+        return tuple(out)
+
+    @staticmethod
+    def _get_default_blocked_patterns() -> Tuple[str, ...]:
+        return _DEFAULT_BLOCKED_PATTERNS
+
+    @classmethod
+    def is_normalized(cls, v: Any, type_name: str) -> bool:
+        """判断值是否已是该类型的标准化结果"""
+        check = cls.NORMALIZED_CHECKS.get(type_name)
+        return check is not None and check(v)
 
     @classmethod
     def normalize(cls, v: Any, type_name: str) -> Any:
@@ -149,11 +222,39 @@ class ConfigSchemaRegistry:
 
     @classmethod
     def get_all_schemas(cls) -> Dict[str, ConfigSchema]:
-        """获取所有配置模式"""
-        schemas = {}
-        for schema in cls.GLOBAL_SCHEMAS + cls.MYSQL_SCHEMAS:
-            schemas[schema.key] = schema
-        return schemas
+        """获取所有配置模式（模块加载时构建一次，调用方不应修改）"""
+        return _ALL_SCHEMAS
+
+
+# 配置模式、配置键与标准化后的默认值只构建一次，键统一驻留以加快字典查找
+_ALL_SCHEMAS: Dict[str, ConfigSchema] = {
+    sys.intern(schema.key): schema
+    for schema in ConfigSchemaRegistry.GLOBAL_SCHEMAS + ConfigSchemaRegistry.MYSQL_SCHEMAS
+}
+_CFG_KEYS: Tuple[str, ...] = tuple(_ALL_SCHEMAS)
+# 配置键 -> 类型转换函数的分派表，标准化时每个键只需一次字典查找
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    k: ConfigNormalizer.TYPE_CONVERTERS[schema.type_converter] for k, schema in _ALL_SCHEMAS.items()
+}
+_DEFAULTS: Dict[str, Any] = {
+    k: ConfigNormalizer.normalize(schema.default, schema.type_converter) for k, schema in _ALL_SCHEMAS.items()
+}
+
+
+def _coerce(caster: Callable[[Any], Any], v: Any) -> Any:
+    """按分派表转换配置值，转换失败时保留原值（与 ConfigNormalizer.normalize 一致）"""
+    if v is None:
+        return None
+    try:
+        return caster(v)
+    except (ValueError, TypeError):
+        return v
+
+
+def _default_value(k: str) -> Any:
+    """获取默认值，可变容器返回副本"""
+    v = _DEFAULTS[k]
+    return v.copy() if isinstance(v, (set, list)) else v
 
 
 class EnvironmentLoader:
@@ -168,26 +269,31 @@ class EnvironmentLoader:
         # 加载通用配置
         common_env_path = self.root_dir / "envs" / "common.env"
         if common_env_path.exists():
-            load_dotenv(common_env_path, override=False)
+            load_env_file(common_env_path, override=False)
 
         # 加载服务特定配置
         service_env_path = self.root_dir / "envs" / f"{self.service_name}.env"
         if service_env_path.exists():
-            load_dotenv(service_env_path, override=True)
+            load_env_file(service_env_path, override=True)
+
+    def load_config_from_env(self, env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+        """从环境变量加载配置
 
-    def load_config_from_env(self) -> Dict[str, Any]:
-        """从环境变量加载配置"""
+        Args:
+            env: 环境变量映射，默认使用 os.environ
+        """
         self.load_env_files()
 
         config = {}
-        schemas = ConfigSchemaRegistry.get_all_schemas()
+        # 只取一次环境变量映射，避免逐项调用 os.getenv
+        env_get = (os.environ if env is None else env).get
 
-        for k, schema in schemas.items():
-            env_value = os.getenv(k)
+        for k in _CFG_KEYS:
+            env_value = env_get(k)
             if env_value is not None:
-                config[k] = ConfigNormalizer.normalize(env_value, str(schema.type_converter))
+                config[k] = _coerce(_COERCERS[k], env_value)
             else:
-                config[k] = schema.default
+                config[k] = _default_value(k)
 
         return config
 
@@ -220,6 +326,27 @@ class EnvironmentRuleEngine:
                 config['MYSQL_DATABASE_ACCESS_LEVEL'] = DatabaseAccessLevel.PERMISSIVE.value
 
 
+def _new_config_hasher():
+    """创建配置哈希器: 优先使用 xxhash，未安装时退回 blake2b"""
+    if xxhash is not None:
+        return xxhash.xxh3_64()
+    return hashlib.blake2b(digest_size=8)
+
+
+def _hash_config_item(k: str, v: Any) -> int:
+    """计算单个配置项的 64 位哈希"""
+    hasher = _new_config_hasher()
+    hasher.update(k.encode('utf-8'))
+    hasher.update(b'=')
+    hasher.update(repr(v).encode('utf-8'))
+    return int.from_bytes(hasher.digest(), 'big')
+
+
+def _copy_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """复制配置字典，同时复制其中的可变容器，避免不同会话共享可变值"""
+    return {k: v.copy() if isinstance(v, (set, list, dict)) else v for k, v in config.items()}
+
+
 class SessionConfigManager:
     """会话级配置管理器"""
 
@@ -227,7 +354,12 @@ class SessionConfigManager:
         self.service_name = service_name
         self.server_config: Dict[str, Any] = {}
         self._config_hash = ''
+        # 各配置项的哈希及其异或合成值，用于增量更新配置哈希
+        self._key_hashes: Dict[str, int] = {}
+        self._combined_hash = 0
         self._global_env_type: Optional[EnvironmentType] = None
+        # 各匹配方式的阻止模式匹配器，首次使用时编译，阻止模式变更后重建
+        self._blocked_matchers: Dict[str, Tuple[Pattern[str], ...]] = {}
 
         # 加载配置
         if initial_config is not None:
@@ -235,62 +367,120 @@ class SessionConfigManager:
         else:
             self._load_from_env()
 
+        self._bind_views()
         self._update_hash()
 
+    def _bind_views(self) -> None:
+        """绑定配置字典的只读视图与 get 方法"""
+        # 只读视图: update() 原地修改 server_config，视图始终有效
+        self._ro_view: Mapping[str, Any] = MappingProxyType(self.server_config)
+        # server_config 在实例生命周期内不会被替换，直接绑定 dict.get，省去一层 Python 方法调用
+        self.get = self.server_config.get
+
+    def clone(self) -> "SessionConfigManager":
+        """复制当前会话配置，跳过标准化与哈希计算
+
+        用于以同一份默认配置为模板为每个请求创建独立的会话配置，
+        副本的修改不会影响模板
+        """
+        other = SessionConfigManager.__new__(SessionConfigManager)
+        other.service_name = self.service_name
+        other.server_config = _copy_config(self.server_config)
+        other._config_hash = self._config_hash
+        other._key_hashes = self._key_hashes.copy()
+        other._combined_hash = self._combined_hash
+        other._global_env_type = self._global_env_type
+        other._blocked_matchers = self._blocked_matchers.copy()
+        other._bind_views()
+        return other
+
     def _get_global_env_type(self) -> EnvironmentType:
         """获取全局环境类型"""
         if self._global_env_type is None:
-            env_str = os.getenv('ENV_TYPE', 'development').lower()
-            try:
-                self._global_env_type = EnvironmentType(env_str)
-            except ValueError:
-                self._global_env_type = EnvironmentType.DEVELOPMENT
+            self._global_env_type = _to_enum(EnvironmentType, os.getenv('ENV_TYPE', 'development'),
+                                             EnvironmentType.DEVELOPMENT)
         return self._global_env_type
 
     def _normalize_external_config(self, raw_config: Dict[str, Any]) -> Dict[str, Any]:
         """标准化外部配置"""
-        normalized = {}
+        return self._normalize_config(raw_config, self._get_global_env_type())
+
+    @staticmethod
+    def _normalize_config(raw_config: Dict[str, Any], env_type: EnvironmentType) -> Dict[str, Any]:
+        """执行外部配置的标准化"""
         schemas = ConfigSchemaRegistry.get_all_schemas()
 
-        # 标准化输入的配置
-        for k, v in raw_config.items():
-            key_upper = k.upper()
-            schema = schemas.get(key_upper)
+        # 快速路径: 非生产环境且输入已是标准化的配置，只需补全默认值
+        if env_type is not EnvironmentType.PRODUCTION and SessionConfigManager._is_normalized(raw_config, schemas):
+            normalized = _copy_config(raw_config)
+            SessionConfigManager._apply_defaults(normalized)
+            EnvironmentRuleEngine.apply_environment_rules(normalized, env_type)
+            return normalized
 
-            if schema:
-                normalized[key_upper] = ConfigNormalizer.normalize(v, schema.type_converter)
-            else:
-                # 未知配置项直接存储
-                normalized[key_upper] = v
+        normalized = {}
+
+        # 标准化输入的配置: 遍历一次原始配置，按分派表查找转换函数
+        coercers_get = _COERCERS.get
+        for k, v in raw_config.items():
+            key_upper = sys.intern(k.upper())
+            caster = coercers_get(key_upper)
+            # 未知配置项直接存储
+            normalized[key_upper] = v if caster is None else _coerce(caster, v)
 
         # 应用默认值
-        SessionConfigManager._apply_defaults(normalized, schemas)
+        SessionConfigManager._apply_defaults(normalized)
 
         # 应用环境规则
-        env_type = self._get_global_env_type()
         EnvironmentRuleEngine.apply_environment_rules(normalized, env_type)
 
         return normalized
 
     @staticmethod
-    def _apply_defaults(config: Dict[str, Any], schemas: Dict[str, ConfigSchema]) -> None:
-        """应用默认值"""
-        for k, schema in schemas.items():
+    def _is_normalized(raw_config: Dict[str, Any], schemas: Dict[str, ConfigSchema]) -> bool:
+        """判断外部配置的键和值是否都已是标准化形式"""
+        for k, v in raw_config.items():
+            if not isinstance(k, str) or k != k.upper():
+                return False
+            schema = schemas.get(k)
+            if schema and not ConfigNormalizer.is_normalized(v, schema.type_converter):
+                return False
+        return True
+
+    @staticmethod
+    def _apply_defaults(config: Dict[str, Any]) -> None:
+        """应用默认值（默认值同样经过标准化，保证配置中的值类型一致）"""
+        for k in _CFG_KEYS:
             if k not in config:
-                config[k] = schema.default
+                config[k] = _default_value(k)
 
     def _load_from_env(self) -> None:
         """从环境文件加载配置"""
         loader = EnvironmentLoader(self.service_name)
-        self.server_config = loader.load_config_from_env()
+        self.server_config = loader.load_config_from_env(os.environ)
+
+        # 环境类型已随配置一起读取并标准化，直接复用，无需再次查询环境变量
+        self._global_env_type = _to_enum(EnvironmentType, self.server_config['ENV_TYPE'],
+                                         EnvironmentType.DEVELOPMENT)
 
         # 应用环境规则
-        env_type = self._get_global_env_type()
+        env_type = self._global_env_type
         EnvironmentRuleEngine.apply_environment_rules(self.server_config, env_type)
 
     def _update_hash(self) -> None:
-        """更新配置哈希"""
-        self._config_hash = hashlib.md5(str(sorted(self.server_config.items())).encode('utf-8')).hexdigest()
+        """全量重算配置哈希: 各配置项哈希异或合成，与键的顺序无关"""
+        self._key_hashes = {k: _hash_config_item(k, v) for k, v in self.server_config.items()}
+        self._combined_hash = 0
+        for h in self._key_hashes.values():
+            self._combined_hash ^= h
+        self._config_hash = format(self._combined_hash, '016x')
+
+    def _update_hash_delta(self, changed: Dict[str, Any]) -> None:
+        """增量更新配置哈希: 只重算发生变化的配置项"""
+        for k, v in changed.items():
+            new_hash = _hash_config_item(k, v)
+            self._combined_hash ^= self._key_hashes.get(k, 0) ^ new_hash
+            self._key_hashes[k] = new_hash
+        self._config_hash = format(self._combined_hash, '016x')
 
     def get_global_env_type(self) -> EnvironmentType:
         """获取全局环境类型"""
@@ -303,17 +493,72 @@ class SessionConfigManager:
     def update(self, new_cfg: Dict[str, Any]) -> None:
         """更新配置"""
         normalized_cfg = self._normalize_external_config(new_cfg)
+        _missing = object()
+        changed = {k: v for k, v in normalized_cfg.items() if self.server_config.get(k, _missing) != v}
         self.server_config.update(normalized_cfg)
         if 'ENV_TYPE' in normalized_cfg:
             self._global_env_type = None
-        self._update_hash()
+        if 'MYSQL_BLOCKED_PATTERNS' in changed:
+            self._blocked_matchers.clear()
+        self._update_hash_delta(changed)
+
+    def match_blocked(self, sql: str, mode: str = BLOCKED_MATCH_SUBSTRING) -> bool:
+        """
+        检查 SQL 是否包含阻止模式（不区分大小写）
+
+        Args:
+            sql: SQL 语句
+            mode: 匹配方式，BLOCKED_MATCH_SUBSTRING / BLOCKED_MATCH_WORD / BLOCKED_MATCH_REGEX
+        """
+        try:
+            matchers = self._blocked_matchers[mode]
+        except KeyError:
+            patterns = self.server_config.get('MYSQL_BLOCKED_PATTERNS') or ()
+            matchers = SessionConfigManager._compile_blocked_matcher(tuple(patterns), mode)
+            self._blocked_matchers[mode] = matchers
+        return any(matcher.search(sql) is not None for matcher in matchers)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _compile_blocked_matcher(patterns: Tuple[str, ...], mode: str) -> Tuple[Pattern[str], ...]:
+        """
+        将阻止模式按匹配方式编译为交替式正则，一次扫描完成全部匹配
+
+        正则方式下逐个校验模式，非法模式记录告警后跳过；合并后无法编译时
+        （如模式带有行内全局标志）退回逐个模式匹配
+        """
+        patterns = [p for p in patterns if p]
+        if not patterns:
+            return ()
+        if mode == BLOCKED_MATCH_REGEX:
+            compiled = []
+            for p in patterns:
+                try:
+                    compiled.append(re.compile(p, re.IGNORECASE))
+                except re.error as e:
+                    logger.warning("阻止模式不是合法的正则表达式，已跳过: %s (%s)", p, e)
+            if len(compiled) <= 1:
+                return tuple(compiled)
+            try:
+                return (re.compile('|'.join(f'(?:{m.pattern})' for m in compiled), re.IGNORECASE),)
+            except re.error:
+                return tuple(compiled)
+        # 字面匹配时长模式优先
+        alternation = '|'.join(re.escape(p) for p in sorted(patterns, key=len, reverse=True))
+        if mode == BLOCKED_MATCH_WORD:
+            alternation = rf'\b(?:{alternation})\b'
+        return (re.compile(alternation, re.IGNORECASE),)
 
     def get(self, k: str, default: Any = None) -> Any:
         """获取配置项"""
         return self.server_config.get(k, default)
 
-    def get_all(self) -> Dict[str, Any]:
-        """获取所有配置"""
+    def get_all(self) -> Mapping[str, Any]:
+        """获取所有配置（只读视图，不复制）"""
+        return self._ro_view
+
+    def get_all_copy(self) -> Dict[str, Any]:
+        """获取所有配置的可修改副本"""
         return self.server_config.copy()
 
     def get_config_hash(self) -> str:
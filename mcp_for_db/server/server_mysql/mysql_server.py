@@ -14,6 +14,10 @@ class MySQLMCPServer(BaseMCPServer):
     def __init__(self, config_manager: ConfigManager):
         super().__init__("mysql", config_manager)
         self.global_default_session_config = None
+        # 由全局默认配置构建的会话配置模板，每个请求复制一份使用
+        self._session_config_template = None
+        # 服务级共享连接池的持有者，在全局资源初始化时创建，全局资源关闭时关闭
+        self.shared_db_manager = None
 
         # 注册表初始化为 None，在 initialize_resources 中创建
         self.tool_registry = None
@@ -29,6 +33,8 @@ class MySQLMCPServer(BaseMCPServer):
             self.logger.info("开始初始化MySQL管理器")
             # 获取全局默认会话配置
             self.global_default_session_config = self.config_manager.get_service_config("mysql")
+            # 启动时一次性标准化全局默认配置，请求路径上只需复制模板
+            self._session_config_template = SessionConfigManager(self.global_default_session_config)
             self.logger.info("MySQL管理器初始化完成")
         except Exception as e:
             self.logger.error(f"初始化MySQL管理器失败: {e}")
@@ -273,6 +279,14 @@ class MySQLMCPServer(BaseMCPServer):
             except Exception as e:
                 self.logger.warning(f"启动查询日志刷新线程失败: {e}")
 
+            # 创建服务级共享连接池，连接配置未变更的请求都借用该连接池
+            self.shared_db_manager = DatabaseManager(self._session_config_template.clone())
+            try:
+                await self.shared_db_manager.initialize_pool()
+                self.logger.debug("共享数据库连接池创建完成")
+            except Exception as e:
+                self.logger.warning("创建共享数据库连接池失败，将在首次使用时重试: %s", e)
+
             self.logger.info("MySQL全局资源启动完成")
 
         except Exception as e:
@@ -282,9 +296,10 @@ class MySQLMCPServer(BaseMCPServer):
     async def create_request_context(self):
         """创建MySQL请求上下文"""
         try:
-            # 为每个请求 / 连接创建新的会话配置和数据库管理器
-            session_config = SessionConfigManager(self.global_default_session_config)
-            db_manager = DatabaseManager(session_config)
+            # 每个请求 / 连接复制启动时构建的模板，得到独立的会话配置
+            session_config = self._session_config_template.clone()
+            # 数据库管理器按请求创建，借用服务级共享连接池；切换数据库后改用私有连接池
+            db_manager = DatabaseManager(session_config, self.shared_db_manager)
 
             # 返回请求上下文管理器
             return RequestContext(session_config, db_manager)
@@ -333,9 +348,12 @@ class MySQLMCPServer(BaseMCPServer):
             except Exception as e:
                 self.logger.warning(f"关闭查询日志刷新线程失败: {e}")
 
-            # 关闭所有数据库连接池（静态方法）
+            # 关闭服务级共享连接池，以及仍未关闭的私有连接池
             try:
                 from mcp_for_db.server.server_mysql.config.database import DatabaseManager
+                if self.shared_db_manager is not None:
+                    shared_db_manager, self.shared_db_manager = self.shared_db_manager, None
+                    await shared_db_manager.close_pool()
                 await DatabaseManager.close_all_instances()
                 self.logger.debug("数据库连接池关闭完成")
             except ImportError:
@@ -1,3 +1,4 @@
+import functools
 import json
 import queue
 import time
@@ -10,7 +11,7 @@ from mcp.types import Resource
 
 from mcp_for_db import LOG_LEVEL
 from mcp_for_db.server.common.base import BaseResource, ResourceRegistry
-from mcp_for_db.server.shared.utils import get_logger, configure_logger
+from mcp_for_db.server.shared.utils import get_logger, configure_logger, json_dumps
 
 logger = get_logger(__name__)
 configure_logger(log_filename="mcp_resources_mysql.log")
@@ -29,8 +30,11 @@ os.makedirs(QUERY_LOGS_DIR, exist_ok=True)
 class QueryLogResource(BaseResource):
     """代表具体查询资源的类"""
     auto_register: bool = False
-    # 日志缓存和刷新机制
-    _log_queue = queue.Queue()
+    # 日志缓存和刷新机制: 队列有界，写盘跟不上时丢弃新日志而不阻塞请求
+    _log_queue = queue.Queue(maxsize=10000)
+    # 单批写入的最大日志条数与收集等待时间（秒）
+    _BATCH_SIZE = 256
+    _BATCH_WAIT = 0.2
     _flush_thread = None
     _running = True
     _flush_lock = threading.Lock()
@@ -42,6 +46,17 @@ class QueryLogResource(BaseResource):
         self.description = description
         self.mimeType = "application/json"
 
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _format_second(second: int) -> str:
+        """格式化到秒的时间戳，同一秒内的日志复用结果"""
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+
+    @staticmethod
+    def format_timestamp(timestamp: float) -> str:
+        """将日志时间戳转换为可读格式"""
+        return QueryLogResource._format_second(int(timestamp))
+
     @staticmethod
     def get_log_file_path(tool_name: str) -> str:
         """获取指定工具的日志文件路径"""
@@ -72,62 +87,86 @@ class QueryLogResource(BaseResource):
 
     @staticmethod
     def _flush_worker():
-        """日志刷新工作线程"""
-        while QueryLogResource._running or not QueryLogResource._log_queue.empty():
+        """日志刷新工作线程: 批量取出日志，按工具合并后每个日志文件只读写一次"""
+        log_queue = QueryLogResource._log_queue
+        while QueryLogResource._running or not log_queue.empty():
             try:
                 # 从队列中获取日志条目
                 try:
-                    tool_name, log_entry = QueryLogResource._log_queue.get(timeout=1)
+                    batch = [log_queue.get(timeout=1)]
                 except queue.Empty:
                     continue
 
-                # 获取文件路径
-                file_path = QueryLogResource.get_log_file_path(tool_name)
+                # 在短时间窗口内继续收集，凑成一批
+                deadline = time.monotonic() + QueryLogResource._BATCH_WAIT
+                while len(batch) < QueryLogResource._BATCH_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(log_queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                # 按工具分组
+                grouped: Dict[str, List[Dict]] = {}
+                for tool_name, log_entry in batch:
+                    grouped.setdefault(tool_name, []).append(log_entry)
 
                 # 使用锁确保线程安全
                 with QueryLogResource._flush_lock:
-                    # 如果文件不存在，创建新文件并初始化为空数组
-                    if not os.path.exists(file_path):
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            json.dump([], f)
-                        logger.info(f"创建新的日志文件: {file_path}")
-
-                    # 读取现有日志
-                    logs = []
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            # 检查文件是否为空
-                            if os.path.getsize(file_path) > 0:
-                                try:
-                                    logs = json.load(f)
-                                except json.JSONDecodeError:
-                                    logger.error(f"日志文件 {file_path} 格式错误，将重置文件")
-                                    logs = []
-                    except Exception as e:
-                        logger.error(f"读取日志文件失败: {str(e)}")
-                        continue
-
-                    # 添加新日志
-                    logs.append(log_entry)
-
-                    # 写入文件
-                    try:
-                        # 使用临时文件写入，避免写入过程中出错导致文件损坏
-                        temp_path = file_path + ".tmp"
-                        with open(temp_path, 'w', encoding='utf-8') as f:
-                            json.dump(logs, f, ensure_ascii=False, indent=4)
-
-                        # 原子操作：重命名临时文件为正式文件
-                        os.replace(temp_path, file_path)
-                        logger.debug(f"追加日志到 {file_path}")
-                    except Exception as e:
-                        logger.error(f"写入日志文件失败: {str(e)}")
+                    for tool_name, entries in grouped.items():
+                        QueryLogResource._append_logs(tool_name, entries)
 
                 # 标记任务完成
-                QueryLogResource._log_queue.task_done()
+                for _ in batch:
+                    log_queue.task_done()
             except Exception as e:
                 logger.error(f"日志刷新线程出错: {str(e)}")
 
+    @staticmethod
+    def _append_logs(tool_name: str, entries: List[Dict]) -> None:
+        """将一批日志追加到指定工具的日志文件"""
+        # 获取文件路径
+        file_path = QueryLogResource.get_log_file_path(tool_name)
+
+        # 如果文件不存在，创建新文件并初始化为空数组
+        if not os.path.exists(file_path):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump([], f)
+            logger.info(f"创建新的日志文件: {file_path}")
+
+        # 读取现有日志
+        logs = []
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                # 检查文件是否为空
+                if os.path.getsize(file_path) > 0:
+                    try:
+                        logs = json.load(f)
+                    except json.JSONDecodeError:
+                        logger.error(f"日志文件 {file_path} 格式错误，将重置文件")
+                        logs = []
+        except Exception as e:
+            logger.error(f"读取日志文件失败: {str(e)}")
+            return
+
+        # 添加新日志
+        logs.extend(entries)
+
+        # 写入文件
+        try:
+            # 使用临时文件写入，避免写入过程中出错导致文件损坏
+            temp_path = file_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(logs, f, ensure_ascii=False, indent=4)
+
+            # 原子操作：重命名临时文件为正式文件
+            os.replace(temp_path, file_path)
+            logger.debug("追加 %s 条日志到 %s", len(entries), file_path)
+        except Exception as e:
+            logger.error(f"写入日志文件失败: {str(e)}")
+
     @staticmethod
     def load_logs(tool_name: str) -> List[Dict]:
         """从JSON文件加载指定工具的查询日志"""
@@ -177,8 +216,12 @@ class QueryLogResource(BaseResource):
         }
 
         # 将日志条目添加到队列
-        QueryLogResource._log_queue.put((tool_name, log_entry))
-        logger.debug(f"添加日志到队列: {tool_name} - {operation[:50]}...")
+        try:
+            QueryLogResource._log_queue.put_nowait((tool_name, log_entry))
+        except queue.Full:
+            logger.warning("查询日志队列已满，丢弃日志: %s", tool_name)
+            return
+        logger.debug("添加日志到队列: %s - %s...", tool_name, operation[:50])
 
     async def get_resource_descriptions(self) -> List[Resource]:
         """返回工具SQL日志资源的描述:已返回"""
@@ -219,13 +262,10 @@ class QueryLogResource(BaseResource):
             formatted_logs = []
             for log in logs:
                 formatted_log = log.copy()
-                formatted_log["timestamp"] = time.strftime(
-                    "%Y-%m-%d %H:%M:%S",
-                    time.localtime(log["timestamp"])
-                )
+                formatted_log["timestamp"] = self.format_timestamp(log["timestamp"])
                 formatted_logs.append(formatted_log)
 
-            return json.dumps({
+            return json_dumps({
                 "success": True,
                 "operator": operator,
                 "limit": limit,
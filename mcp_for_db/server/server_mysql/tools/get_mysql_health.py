@@ -54,10 +54,10 @@ class GetDBHealthRunning(BaseHandler):
         try:
             sql = "SHOW FULL PROCESSLIST;SHOW VARIABLES LIKE 'max_connections';"
 
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_db_health_running"})
         except Exception as e:
-            logger.error(f"执行查询时出错: {str(e)}")
+            logger.error("执行查询时出错: %s", e)
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
     """
@@ -70,11 +70,11 @@ class GetDBHealthRunning(BaseHandler):
         try:
             sql = "SHOW ENGINE INNODB STATUS;"
 
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
 
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_db_health_running"})
         except Exception as e:
-            logger.error(f"执行查询时出错: {str(e)}")
+            logger.error("执行查询时出错: %s", e)
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
     """
@@ -87,11 +87,11 @@ class GetDBHealthRunning(BaseHandler):
         try:
             sql = "SELECT * FROM INFORMATION_SCHEMA.INNODB_TRX;"
 
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
 
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_db_health_running"})
         except Exception as e:
-            logger.error(f"执行查询时出错: {str(e)}")
+            logger.error("执行查询时出错: %s", e)
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
     """
@@ -129,13 +129,13 @@ class GetDBHealthRunning(BaseHandler):
                 """
 
             # 执行版本特定的锁查询
-            logger.info(f"执行的 SQL 语句：{lock_sql}")
+            logger.info("执行的 SQL 语句：%s", lock_sql)
             lock_result = await execute_sql.run_tool({"query": lock_sql, "tool_name": "get_db_health_running"})
             results.extend(lock_result)
             return results
 
         except Exception as e:
-            logger.error(f"获取锁信息时出错: {str(e)}")
+            logger.error("获取锁信息时出错: %s", e)
             return [TextContent(type="text", text=f"获取锁信息时出错: {str(e)}")]
 
 
@@ -181,11 +181,11 @@ class GetDBHealthIndexUsage(BaseHandler):
             sql = "SELECT object_name,index_name,count_star from performance_schema.table_io_waits_summary_by_index_usage "
             sql += f"WHERE object_schema = '{config['database']}' and count_star = 0 AND sum_timer_wait = 0 ;"
 
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
 
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_db_health_index_usage"})
         except Exception as e:
-            logger.error(f"执行查询时出错: {str(e)}")
+            logger.error("执行查询时出错: %s", e)
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
     """
@@ -200,11 +200,11 @@ class GetDBHealthIndexUsage(BaseHandler):
             sql += f"FROM performance_schema.table_io_waits_summary_by_index_usage where object_schema = '{config['database']}' "
             sql += "and index_name is not null ORDER BY  max_timer_wait DESC;"
 
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
 
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_db_health_index_usage"})
         except Exception as e:
-            logger.error(f"执行查询时出错: {str(e)}")
+            logger.error("执行查询时出错: %s", e)
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
     """
@@ -219,11 +219,11 @@ class GetDBHealthIndexUsage(BaseHandler):
             sql += f"FROM performance_schema.table_io_waits_summary_by_index_usage where object_schema = '{config['database']}' "
             sql += "and index_name IS null and max_timer_wait > 30000000000000 ORDER BY max_timer_wait DESC limit 10;"
 
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
 
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_db_health_index_usage"})
         except Exception as e:
-            logger.error(f"执行查询时出错: {str(e)}")
+            logger.error("执行查询时出错: %s", e)
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
 
@@ -283,7 +283,7 @@ class GetProcessList(BaseHandler):
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_process_list"})
 
         except Exception as e:
-            logger.error(f"获取进程列表失败: {str(e)}", exc_info=True)
+            logger.error("获取进程列表失败: %s", e, exc_info=True)
             return [TextContent(type="text", text=f"获取进程列表失败: {str(e)}")]
 
 ########################################################################################################################
@@ -9,12 +9,18 @@ from mcp import Tool
 from mcp.types import TextContent
 from mcp_for_db.server.server_mysql.config import get_current_database_manager
 from mcp_for_db.server.server_mysql.tools import ExecuteSQL
-from mcp_for_db.server.shared.utils import get_logger, configure_logger
+from mcp_for_db.server.shared.utils import get_logger, configure_logger, json_dumps, json_loads
 
 logger = get_logger(__name__)
 configure_logger(log_filename="mcp_tools_mysql.log")
 logger.setLevel(LOG_LEVEL)
 
+# 结果解析使用的正则在模块加载时预编译
+_DIGIT_RE = re.compile(r'\d+')
+_ANSI_ESCAPE_RE = re.compile(r'\x1b\[\d+m')
+_WORDS_LINE_RE = re.compile(r'\w+(\s+\w+)*')
+_SEPARATOR_LINE_RE = re.compile(r'[-+|,]+')
+
 
 class CollectTableStats(BaseHandler):
     """收集表的元数据、统计信息和数据分布情况的工具"""
@@ -75,7 +81,7 @@ class CollectTableStats(BaseHandler):
 
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=json_dumps(result, indent=True)
             )]
 
         except Exception as e:
@@ -113,14 +119,14 @@ class CollectTableStats(BaseHandler):
                         content = item.text
                     # 尝试解析为JSON
                     elif item.text.strip().startswith('{') or item.text.strip().startswith('['):
-                        content = json.loads(item.text)
+                        content = json_loads(item.text)
                     # 尝试解析为表格格式
                     else:
                         content = self.parse_tabular_data(item.text)
-                except RuntimeError:
+                except (RuntimeError, ValueError):
                     # 尝试直接提取数字值
                     text = item.text.strip()
-                    if re.match(r'^\d+$', text):
+                    if _DIGIT_RE.fullmatch(text):
                         content = int(text)
                     else:
                         content = item.text
@@ -143,7 +149,7 @@ class CollectTableStats(BaseHandler):
     def parse_tabular_data(self, data: str) -> list:
         """解析表格格式的数据"""
         # 移除结果中的ASCII转义序列
-        data = re.sub(r'\x1b\[\d+m', '', data)
+        data = _ANSI_ESCAPE_RE.sub('', data)
 
         # 分割行
         lines = [line.strip() for line in data.split("\n") if line.strip()]
@@ -151,7 +157,7 @@ class CollectTableStats(BaseHandler):
             return []
 
         # 检查是否是表格格式（有标题行）
-        if "|" in lines[0] or "," in lines[0] or re.match(r'^\w+(\s+\w+)*$', lines[0]):
+        if "|" in lines[0] or "," in lines[0] or _WORDS_LINE_RE.fullmatch(lines[0]):
             # 尝试确定分隔符
             if "|" in lines[0]:
                 delimiter = "|"
@@ -167,7 +173,7 @@ class CollectTableStats(BaseHandler):
 
             for line in lines:
                 # 如果是分隔线则跳过
-                if re.match(r'^[-+|,]+$', line):
+                if _SEPARATOR_LINE_RE.fullmatch(line):
                     continue
                 if header_line is None:
                     header_line = line
@@ -189,7 +195,7 @@ class CollectTableStats(BaseHandler):
             # 解析数据行
             for line in data_lines:
                 # 跳过分隔线
-                if re.match(r'^[-+|,]+$', line):
+                if _SEPARATOR_LINE_RE.fullmatch(line):
                     continue
 
                 if delimiter:
@@ -436,7 +442,7 @@ class CollectTableStats(BaseHandler):
         rows = []
         for line in lines[2:]:
             # 跳过分隔线
-            if re.match(r'^[-+|,]+$', line):
+            if _SEPARATOR_LINE_RE.fullmatch(line):
                 continue
 
             values = [v.strip() for v in line.split(delimiter)[1:-1]]
@@ -497,8 +503,8 @@ class CollectTableStats(BaseHandler):
                         if line.strip():
                             columns.append(line.strip())
 
-        # 去重并过滤空值
-        columns = list(set([col for col in columns if col]))
+        # 去重并过滤空值，保持列的原始顺序
+        columns = tuple(dict.fromkeys(col for col in columns if col))
 
         if not columns:
             distribution[table_name] = table_distribution
@@ -523,17 +529,20 @@ class CollectTableStats(BaseHandler):
 
         # 优化策略2: 使用单个查询获取所有列的不同值数量
         try:
-            # 构建单个查询获取所有列的不同值数量
-            distinct_count_query = f"""
-                SELECT
-                    {', '.join([f'COUNT(DISTINCT `{col}`) AS `{col}_distinct`' for col in columns if col not in indexed_columns])}
-                FROM `{table_name}`
-            """
+            # 非索引列只计算一次，供查询构建与跳过判断共用
+            non_indexed_columns = tuple(col for col in columns if col not in indexed_columns)
 
             # 如果所有列都是索引列，则跳过查询
-            if not any(col not in indexed_columns for col in columns):
+            if not non_indexed_columns:
                 distinct_count_data = []
             else:
+                # 构建单个查询获取所有列的不同值数量
+                select_list = ', '.join(f'COUNT(DISTINCT `{col}`) AS `{col}_distinct`' for col in non_indexed_columns)
+                distinct_count_query = f"""
+                    SELECT
+                        {select_list}
+                    FROM `{table_name}`
+                """
                 distinct_count_result = await execute_sql.run_tool(
                     {"query": distinct_count_query, "tool_name": "collect_table_stats"})
                 distinct_count_data = self.parse_result(distinct_count_result)
@@ -599,7 +608,7 @@ class CollectTableStats(BaseHandler):
                                         break
                                 elif isinstance(item["raw"], str):
                                     # 尝试从字符串中提取数字
-                                    match = re.search(r'\d+', item["raw"])
+                                    match = _DIGIT_RE.search(item["raw"])
                                     if match:
                                         distinct_count = int(match.group())
                                         break
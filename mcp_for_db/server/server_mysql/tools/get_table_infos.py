@@ -14,6 +14,27 @@ configure_logger(log_filename="mcp_tools_mysql.log")
 logger.setLevel(LOG_LEVEL)
 
 
+# MySQL 8.0+ 行级锁等待查询（静态语句，由相邻字面量在编译期拼接）
+_MYSQL8_LOCK_WAITS_SQL = (
+    "SELECT p2.HOST AS '被阻塞方host',p2.USER AS '被阻塞方用户',r.trx_id AS '被阻塞方事务id', "
+    "r.trx_mysql_thread_id AS '被阻塞方线程号',TIMESTAMPDIFF(SECOND, r.trx_wait_started, CURRENT_TIMESTAMP) AS '等待时间',"
+    "r.trx_query AS '被阻塞的查询',dlr.OBJECT_SCHEMA AS '被阻塞方锁库',dlr.OBJECT_NAME AS '被阻塞方锁表',"
+    "dlr.LOCK_MODE AS '被阻塞方锁模式', dlr.LOCK_TYPE AS '被阻塞方锁类型',dlr.INDEX_NAME AS '被阻塞方锁住的索引',"
+    "dlr.LOCK_DATA AS '被阻塞方锁定记录的主键值',p.HOST AS '阻塞方主机',p.USER AS '阻塞方用户',b.trx_id AS '阻塞方事务id',"
+    "b.trx_mysql_thread_id AS '阻塞方线程号',b.trx_query AS '阻塞方查询',dlb.LOCK_MODE AS '阻塞方锁模式',"
+    "dlb.LOCK_TYPE AS '阻塞方锁类型',dlb.INDEX_NAME AS '阻塞方锁住的索引',dlb.LOCK_DATA AS '阻塞方锁定记录的主键值',"
+    "IF(p.COMMAND = 'Sleep', CONCAT(p.TIME, ' 秒'), 0) AS '阻塞方事务空闲的时间' "
+    "FROM performance_schema.data_lock_waits w "
+    "JOIN performance_schema.data_locks dlr ON w.REQUESTING_ENGINE_LOCK_ID = dlr.ENGINE_LOCK_ID "
+    "JOIN performance_schema.data_locks dlb ON w.BLOCKING_ENGINE_LOCK_ID = dlb.ENGINE_LOCK_ID "
+    "JOIN information_schema.innodb_trx r ON w.REQUESTING_ENGINE_TRANSACTION_ID = r.trx_id "
+    "JOIN information_schema.innodb_trx b ON w.BLOCKING_ENGINE_TRANSACTION_ID = b.trx_id "
+    "JOIN information_schema.processlist p ON b.trx_mysql_thread_id = p.ID "
+    "JOIN information_schema.processlist p2 ON r.trx_mysql_thread_id = p2.ID "
+    "ORDER BY '等待时间' DESC;"
+)
+
+
 class GetTableName(BaseHandler):
     name = "get_table_name"
     description = ENHANCED_DESCRIPTIONS.get("get_table_name")
@@ -60,12 +81,12 @@ class GetTableName(BaseHandler):
             sql += f"FROM information_schema.TABLES WHERE TABLE_SCHEMA = '{config['database']}' AND TABLE_COMMENT LIKE '%{text}%';"
 
             # 安全记录日志（避免记录敏感数据）
-            logger.info(f"搜索数据库: {config['database']}, 关键字: {text}")
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("搜索数据库: %s, 关键字: %s", config['database'], text)
+            logger.info("执行的 SQL 语句：%s", sql)
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_table_name"})
 
         except Exception as e:
-            logger.error(f"执行查询时出错: {str(e)}", exc_info=True)
+            logger.error("执行查询时出错: %s", e, exc_info=True)
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
 
@@ -122,7 +143,7 @@ class GetTableDesc(BaseHandler):
             sql += f"FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = '{config['database']}' "
             sql += f"AND TABLE_NAME IN ('{table_condition}') ORDER BY TABLE_NAME, ORDINAL_POSITION;"
 
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
 
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_table_desc"})
 
@@ -238,23 +259,8 @@ class GetTableLock(BaseHandler):
 
         if major_version >= 8:
             # MySQL 8.0+ 专用查询
-            sql = "SELECT p2.HOST AS '被阻塞方host',p2.USER AS '被阻塞方用户',r.trx_id AS '被阻塞方事务id', "
-            sql += "r.trx_mysql_thread_id AS '被阻塞方线程号',TIMESTAMPDIFF(SECOND, r.trx_wait_started, CURRENT_TIMESTAMP) AS '等待时间',"
-            sql += "r.trx_query AS '被阻塞的查询',dlr.OBJECT_SCHEMA AS '被阻塞方锁库',dlr.OBJECT_NAME AS '被阻塞方锁表',"
-            sql += "dlr.LOCK_MODE AS '被阻塞方锁模式', dlr.LOCK_TYPE AS '被阻塞方锁类型',dlr.INDEX_NAME AS '被阻塞方锁住的索引',"
-            sql += "dlr.LOCK_DATA AS '被阻塞方锁定记录的主键值',p.HOST AS '阻塞方主机',p.USER AS '阻塞方用户',b.trx_id AS '阻塞方事务id',"
-            sql += "b.trx_mysql_thread_id AS '阻塞方线程号',b.trx_query AS '阻塞方查询',dlb.LOCK_MODE AS '阻塞方锁模式',"
-            sql += "dlb.LOCK_TYPE AS '阻塞方锁类型',dlb.INDEX_NAME AS '阻塞方锁住的索引',dlb.LOCK_DATA AS '阻塞方锁定记录的主键值',"
-            sql += "IF(p.COMMAND = 'Sleep', CONCAT(p.TIME, ' 秒'), 0) AS '阻塞方事务空闲的时间' "
-            sql += "FROM performance_schema.data_lock_waits w "
-            sql += "JOIN performance_schema.data_locks dlr ON w.REQUESTING_ENGINE_LOCK_ID = dlr.ENGINE_LOCK_ID "
-            sql += "JOIN performance_schema.data_locks dlb ON w.BLOCKING_ENGINE_LOCK_ID = dlb.ENGINE_LOCK_ID "
-            sql += "JOIN information_schema.innodb_trx r ON w.REQUESTING_ENGINE_TRANSACTION_ID = r.trx_id "
-            sql += "JOIN information_schema.innodb_trx b ON w.BLOCKING_ENGINE_TRANSACTION_ID = b.trx_id "
-            sql += "JOIN information_schema.processlist p ON b.trx_mysql_thread_id = p.ID "
-            sql += "JOIN information_schema.processlist p2 ON r.trx_mysql_thread_id = p2.ID "
-            sql += "ORDER BY '等待时间' DESC;"
-            logger.info(f"执行的 MySQL 8.x 锁查询语句：{sql}")
+            sql = _MYSQL8_LOCK_WAITS_SQL
+            logger.info("执行的 MySQL 8.x 锁查询语句：%s", sql)
         else:
             # MySQL 5.7 专用查询
             sql = """SELECT 
@@ -272,12 +278,12 @@ class GetTableLock(BaseHandler):
                     JOIN information_schema.innodb_trx r ON r.trx_id = w.requesting_trx_id
                     LEFT JOIN information_schema.innodb_locks k ON k.lock_id = w.blocking_lock_id
             """
-            logger.info(f"执行的 MySQL 5.7 锁查询语句：{sql}")
+            logger.info("执行的 MySQL 5.7 锁查询语句：%s", sql)
 
         try:
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_table_lock"})
         except Exception as e:
-            logger.error(f"锁查询失败: {str(e)}")
+            logger.error("锁查询失败: %s", e)
             return [TextContent(text=f"锁查询失败: {str(e)}")]
 
     async def get_table_use(self) -> Sequence[TextContent]:
@@ -285,10 +291,10 @@ class GetTableLock(BaseHandler):
         execute_sql = ExecuteSQL()
         try:
             sql = "SHOW OPEN TABLES WHERE In_use > 0;"
-            logger.info(f"执行的 SQL 语句：{sql}")
+            logger.info("执行的 SQL 语句：%s", sql)
             return await execute_sql.run_tool({"query": sql, "tool_name": "get_table_lock"})
         except Exception as e:
-            logger.error(f"表级锁查询失败: {str(e)}")
+            logger.error("表级锁查询失败: %s", e)
             return [TextContent(text=f"表级锁查询失败: {str(e)}")]
 
 
@@ -360,7 +366,7 @@ class GetDatabaseInfo(BaseHandler):
             return await execute_sql.run_tool({"query": sql, "parameters": params, "tool_name": "get_database_info"})
 
         except Exception as e:
-            logger.error(f"获取数据库信息失败: {str(e)}", exc_info=True)
+            logger.error("获取数据库信息失败: %s", e, exc_info=True)
             return [TextContent(type="text", text=f"获取数据库信息失败: {str(e)}")]
 
 
@@ -407,7 +413,7 @@ class GetDatabaseTables(BaseHandler):
             return await execute_sql.run_tool({"query": sql, "parameters": params, "tool_name": "get_database_tables"})
 
         except Exception as e:
-            logger.error(f"获取数据库表信息失败: {str(e)}", exc_info=True)
+            logger.error("获取数据库表信息失败: %s", e, exc_info=True)
             return [TextContent(type="text", text=f"获取数据库表信息失败: {str(e)}")]
 
 
@@ -493,7 +499,7 @@ class GetTableStats(BaseHandler):
                 return stats_result
 
         except Exception as e:
-            logger.error(f"分析表统计信息失败: {str(e)}", exc_info=True)
+            logger.error("分析表统计信息失败: %s", e, exc_info=True)
             return [TextContent(type="text", text=f"分析表统计信息失败: {str(e)}")]
 
 
@@ -603,12 +609,12 @@ class CheckTableConstraints(BaseHandler):
                         })
                         results.extend(check_result)
                     except RuntimeError:
-                        logger.warning(f"检查约束查询失败: {e}")
+                        logger.warning("检查约束查询失败: %s", e)
 
             return results
 
         except Exception as e:
-            logger.error(f"获取表约束信息失败: {str(e)}", exc_info=True)
+            logger.error("获取表约束信息失败: %s", e, exc_info=True)
             return [TextContent(type="text", text=f"获取表约束信息失败: {str(e)}")]
 
 ########################################################################################################################
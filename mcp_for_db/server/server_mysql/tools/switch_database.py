@@ -17,11 +17,8 @@ logger.setLevel(LOG_LEVEL)
 
 async def _reinitialize_db_pool(db_manager) -> None:
     """重新初始化数据库连接池"""
-    if hasattr(db_manager, "close_pool") and callable(db_manager.close_pool):
-        await db_manager.close_pool()
-
-    if hasattr(db_manager, "initialize_pool") and callable(db_manager.initialize_pool):
-        await db_manager.initialize_pool()
+    if hasattr(db_manager, "reset") and callable(db_manager.reset):
+        await db_manager.reset()
 
     logger.info("数据库连接池已重新初始化")
 
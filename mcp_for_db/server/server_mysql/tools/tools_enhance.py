@@ -89,17 +89,12 @@ class SmartTool(BaseHandler):
         user_query = arguments.get("user_query", "")
 
         # 1. 从参数中提取工具特定的参数
-        tool_params = {}
+        tool_params: Dict[str, Dict[str, Any]] = {}
         for key, value in arguments.items():
-            if "." in key:  # 工具特定参数格式为 tool_name.param_name
-                parts = key.split(".", 1)
-                if len(parts) < 2:
-                    continue
-
-                tool_name, param_name = parts
-                if tool_name not in tool_params:
-                    tool_params[tool_name] = {}
-                tool_params[tool_name][param_name] = value
+            # 工具特定参数格式为 tool_name.param_name，单次切分完成识别与拆分
+            tool_name, sep, param_name = key.partition(".")
+            if sep:
+                tool_params.setdefault(tool_name, {})[param_name] = value
 
         # 2. 推荐工具（使用内部工具选择器）
         recommended_tools = ToolSelector.recommend_tools(tool_params)
@@ -1,5 +1,3 @@
-import json
-import time
 from typing import Dict, Any, Sequence
 from mcp import Tool
 from mcp.types import TextContent
@@ -8,7 +6,7 @@ from mcp_for_db import LOG_LEVEL
 from mcp_for_db.server.common import ENHANCED_DESCRIPTIONS
 from mcp_for_db.server.server_mysql.resources import QueryLogResource
 from mcp_for_db.server.common.base import BaseHandler
-from mcp_for_db.server.shared.utils import get_logger, configure_logger
+from mcp_for_db.server.shared.utils import get_logger, configure_logger, json_dumps
 
 logger = get_logger(__name__)
 configure_logger(log_filename="mcp_tools_mysql.log")
@@ -89,10 +87,7 @@ class GetQueryLogs(BaseHandler):
             result = []
             for log in filtered_logs:
                 # 转换时间戳为可读格式
-                timestamp = time.strftime(
-                    "%Y-%m-%d %H:%M:%S",
-                    time.localtime(log["timestamp"])
-                )
+                timestamp = QueryLogResource.format_timestamp(log["timestamp"])
 
                 # 创建结果摘要
                 result_summary = log.get("result", "")[:100] + "..." if log.get("result") else ""
@@ -118,7 +113,7 @@ class GetQueryLogs(BaseHandler):
             if truncated:
                 response["message"] = f"结果集过大，仅显示最近 {limit} 条记录"
 
-            return [TextContent(text=json.dumps(response, indent=2))]
+            return [TextContent(text=json_dumps(response, indent=True))]
 
         except Exception as e:
             logger.error(f"获取查询日志失败: {str(e)}", exc_info=True)
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -28,3 +29,12 @@ class OAuthConfig(BaseSettings):
 
 # 创建配置实例
 oauth_config = OAuthConfig()
+
+# 启动时固化为模块常量，避免每次签发/校验令牌时经由 pydantic 属性访问
+TOKEN_SECRET_KEY = oauth_config.TOKEN_SECRET_KEY
+TOKEN_ALGORITHM = oauth_config.TOKEN_ALGORITHM
+TOKEN_ALGORITHMS = [TOKEN_ALGORITHM]
+ACCESS_TOKEN_EXPIRE_SECONDS = oauth_config.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+REFRESH_TOKEN_EXPIRE_SECONDS = oauth_config.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+ACCESS_TOKEN_EXPIRE_DELTA = timedelta(seconds=ACCESS_TOKEN_EXPIRE_SECONDS)
+REFRESH_TOKEN_EXPIRE_DELTA = timedelta(seconds=REFRESH_TOKEN_EXPIRE_SECONDS)
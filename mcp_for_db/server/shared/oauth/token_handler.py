@@ -1,7 +1,15 @@
 from datetime import datetime, timedelta
 import jwt
 from typing import Dict, Optional, Tuple
-from mcp_for_db.server.shared.oauth.config import oauth_config
+from mcp_for_db.server.shared.oauth.config import (
+    TOKEN_SECRET_KEY,
+    TOKEN_ALGORITHM,
+    TOKEN_ALGORITHMS,
+    ACCESS_TOKEN_EXPIRE_SECONDS,
+    REFRESH_TOKEN_EXPIRE_SECONDS,
+    ACCESS_TOKEN_EXPIRE_DELTA,
+    REFRESH_TOKEN_EXPIRE_DELTA
+)
 
 
 class TokenHandler:
@@ -18,8 +26,8 @@ class TokenHandler:
             Tuple[str, str, datetime, datetime]: (访问令牌, 刷新令牌, 访问令牌过期时间, 刷新令牌过期时间)
         """
         # 计算过期时间
-        access_token_expires = datetime.utcnow() + timedelta(minutes=oauth_config.ACCESS_TOKEN_EXPIRE_MINUTES)
-        refresh_token_expires = datetime.utcnow() + timedelta(days=oauth_config.REFRESH_TOKEN_EXPIRE_DAYS)
+        access_token_expires = datetime.utcnow() + ACCESS_TOKEN_EXPIRE_DELTA
+        refresh_token_expires = datetime.utcnow() + REFRESH_TOKEN_EXPIRE_DELTA
 
         # 访问令牌数据
         access_token_data = {
@@ -42,14 +50,14 @@ class TokenHandler:
         # 生成令牌
         access_token = jwt.encode(
             access_token_data,
-            oauth_config.TOKEN_SECRET_KEY,
-            algorithm=oauth_config.TOKEN_ALGORITHM
+            TOKEN_SECRET_KEY,
+            algorithm=TOKEN_ALGORITHM
         )
 
         refresh_token = jwt.encode(
             refresh_token_data,
-            oauth_config.TOKEN_SECRET_KEY,
-            algorithm=oauth_config.TOKEN_ALGORITHM
+            TOKEN_SECRET_KEY,
+            algorithm=TOKEN_ALGORITHM
         )
 
         return access_token, refresh_token, access_token_expires, refresh_token_expires
@@ -68,8 +76,8 @@ class TokenHandler:
         try:
             payload = jwt.decode(
                 token,
-                oauth_config.TOKEN_SECRET_KEY,
-                algorithms=[oauth_config.TOKEN_ALGORITHM]
+                TOKEN_SECRET_KEY,
+                algorithms=TOKEN_ALGORITHMS
             )
             return payload
         except jwt.InvalidTokenError:
@@ -101,9 +109,9 @@ class TokenHandler:
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "expires_in": oauth_config.ACCESS_TOKEN_EXPIRE_MINUTES * 60,  # 秒
+            "expires_in": ACCESS_TOKEN_EXPIRE_SECONDS,  # 秒
             "refresh_token": refresh_token,
-            "refresh_token_expires_in": oauth_config.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,  # 秒
+            "refresh_token_expires_in": REFRESH_TOKEN_EXPIRE_SECONDS,  # 秒
             "expire_time": access_token_expires_beijing.strftime("%Y-%m-%d %H:%M:%S (北京时间)"),
             "refresh_token_expire_time": refresh_token_expires_beijing.strftime("%Y-%m-%d %H:%M:%S (北京时间)")
         }
@@ -1,5 +1,7 @@
+import asyncio
 import re
-from typing import Set, List, Tuple, Dict, Any
+from functools import lru_cache
+from typing import Set, List, Tuple, Dict, Any, Optional
 
 from mcp_for_db import LOG_LEVEL
 from mcp_for_db.server.server_mysql.config import SessionConfigManager
@@ -23,52 +25,62 @@ class DatabaseScopeViolation(Exception):
 class DatabaseScopeChecker:
     """数据库范围检查器，支持多级访问控制和智能模式匹配"""
 
+    __slots__ = ('session_config', 'is_enabled', 'allowed_database', 'access_level', '_allowed_database_lower',
+                 '_is_restricted')
+
     # 系统数据库列表
-    SYSTEM_DATABASES = {
+    SYSTEM_DATABASES = frozenset({
         'information_schema',
         'server_mysql',
         'performance_schema',
         'sys'
-    }
+    })
 
-    # 跨数据库查询模式
-    CROSS_DB_PATTERNS = [
+    # 跨数据库查询模式：每个子模式用命名组标出数据库名所在位置
+    # FROM/JOIN/INTO/UPDATE/DELETE 后的 database.table 均由通用模式覆盖，无需单独列出
+    CROSS_DB_PATTERNS = (
         # database.table 格式
-        r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b',
+        r'\b(?P<db_table>[a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*[a-zA-Z_][a-zA-Z0-9_]*\b',
         # SHOW TABLES FROM database
-        r'\bSHOW\s+(?:FULL\s+)?TABLES\s+FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)\b',
+        r'\bSHOW\s+(?:FULL\s+)?TABLES\s+FROM\s+(?P<show_from>[a-zA-Z_][a-zA-Z0-9_]*)\b',
         # USE database
-        r'\bUSE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b',
-        # SELECT ... FROM database.table
-        r'\bFROM\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b',
-        # JOIN database.table
-        r'\bJOIN\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b',
-        # INSERT INTO database.table
-        r'\bINTO\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b',
-        # UPDATE database.table
-        r'\bUPDATE\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b',
-        # DELETE FROM database.table
-        r'\bDELETE\s+FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\b',
+        r'\bUSE\s+(?P<use>[a-zA-Z_][a-zA-Z0-9_]*)\b',
         # CREATE DATABASE
-        r'\bCREATE\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b',
+        r'\bCREATE\s+DATABASE\s+(?P<create_db>[a-zA-Z_][a-zA-Z0-9_]*)\b',
         # DROP DATABASE
-        r'\bDROP\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b',
+        r'\bDROP\s+DATABASE\s+(?P<drop_db>[a-zA-Z_][a-zA-Z0-9_]*)\b',
         # ALTER DATABASE
-        r'\bALTER\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b',
-    ]
+        r'\bALTER\s+DATABASE\s+(?P<alter_db>[a-zA-Z_][a-zA-Z0-9_]*)\b',
+    )
+    # 合并为单个交替式正则，一次扫描即可提取全部数据库名
+    CROSS_DB_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in CROSS_DB_PATTERNS), re.IGNORECASE)
 
     # 特殊查询模式
-    SPECIAL_QUERY_PATTERNS = {
-        'SHOW_DATABASES': r'\bSHOW\s+DATABASES\b',
-        'USE_STATEMENT': r'\bUSE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b',
-        'SYSTEM_TABLE_ACCESS': [
-            r'\bserver_mysql\.user\b',
-            r'\bserver_mysql\.db\b',
-            r'\binformation_schema\.',
-            r'\bperformance_schema\.',
-            r'\bsys\.'
-        ]
-    }
+    SHOW_DATABASES_RE = re.compile(r'\bSHOW\s+DATABASES\b', re.IGNORECASE)
+    USE_STATEMENT_RE = re.compile(r'\bUSE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', re.IGNORECASE)
+    SYSTEM_TABLE_ACCESS_RE = re.compile('|'.join((
+        r'\bserver_mysql\.user\b',
+        r'\bserver_mysql\.db\b',
+        r'\binformation_schema\.',
+        r'\bperformance_schema\.',
+        r'\bsys\.'
+    )), re.IGNORECASE)
+    # 系统表访问模式共有的字面前缀（大写），均不出现时跳过正则匹配
+    SYSTEM_TABLE_PREFIXES = ('SERVER_MYSQL.', 'INFORMATION_SCHEMA.', 'PERFORMANCE_SCHEMA.', 'SYS.')
+
+    # 数据库 DDL 操作模式
+    CREATE_DATABASE_RE = re.compile(r'\bCREATE\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', re.IGNORECASE)
+    DROP_DATABASE_RE = re.compile(r'\bDROP\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', re.IGNORECASE)
+    ALTER_DATABASE_RE = re.compile(r'\bALTER\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', re.IGNORECASE)
+
+    # 以上模式都要求 SQL 中出现 "." 或下列关键字之一，均不出现时无需进入正则检查
+    SCOPE_KEYWORDS = ('USE', 'SHOW', 'DATABASE')
+
+    # 进程内缓存的检查结果条数（所有检查器共用）
+    CHECK_CACHE_SIZE = 1024
+
+    # 异步检查时达到该长度的 SQL 放到线程中执行，避免阻塞事件循环；短 SQL 直接检查，省去线程切换开销
+    ASYNC_OFFLOAD_MIN_LENGTH = 16 * 1024
 
     def __init__(self, session_config: SessionConfigManager):
         """
@@ -90,8 +102,12 @@ class DatabaseScopeChecker:
         except ValueError:
             self.access_level = DatabaseAccessLevel.PERMISSIVE
 
-        logger.info(f"数据库范围检查器初始化: 允许数据库={self.allowed_database}, "
-                    f"访问级别={self.access_level.value}, 启用={self.is_enabled}")
+        # 检查时反复用到的派生值在初始化时算好；枚举成员是单例，用 is 比较
+        self._allowed_database_lower = self.allowed_database.lower() if self.allowed_database else ''
+        self._is_restricted = self.access_level is DatabaseAccessLevel.RESTRICTED
+
+        logger.info("数据库范围检查器初始化: 允许数据库=%s, 访问级别=%s, 启用=%s",
+                    self.allowed_database, self.access_level.value, self.is_enabled)
 
     def check_query(self, sql_query: str) -> Tuple[bool, List[str]]:
         """
@@ -106,30 +122,57 @@ class DatabaseScopeChecker:
         if not self.is_enabled:
             return True, []
 
+        violations = list(_check_query_impl(sql_query, self._allowed_database_lower, self.access_level))
+
+        if violations:
+            logger.warning("数据库范围检查失败: %s", violations)
+
+        return not violations, violations
+
+    async def check_query_async(self, sql_query: str) -> Tuple[bool, List[str]]:
+        """check_query 的异步版本，长 SQL 在线程中检查"""
+        if len(sql_query) < self.ASYNC_OFFLOAD_MIN_LENGTH:
+            return self.check_query(sql_query)
+        return await asyncio.to_thread(self.check_query, sql_query)
+
+    @classmethod
+    def _collect_violations(cls, sql_query: str, allowed_database: str,
+                            access_level: DatabaseAccessLevel) -> Tuple[str, ...]:
+        """
+        执行各项范围检查，返回违规详情（元组，便于缓存共享）
+
+        Args:
+            sql_query: SQL查询语句
+            allowed_database: 允许访问的数据库（小写）
+            access_level: 数据库访问级别
+        """
+        upper_sql = sql_query.upper()
+
+        # 快速预过滤：单库的普通查询不可能触发任何范围规则
+        if '.' not in sql_query and not any(keyword in upper_sql for keyword in cls.SCOPE_KEYWORDS):
+            return ()
+
+        # 大写与空白规范化只做一次，供各项检查共用
+        normalized_sql = ' '.join(upper_sql.split())
         violations = []
 
         # 提取查询中涉及的数据库
-        referenced_databases = self._extract_databases(sql_query)
+        referenced_databases = cls._extract_databases(normalized_sql)
 
         # 检查每个引用的数据库
         for db_name in referenced_databases:
-            if not self._is_database_allowed(db_name):
+            if not cls._is_database_allowed(db_name, allowed_database, access_level):
                 violations.append(f"不允许访问数据库: {db_name}")
 
         # 检查特殊查询类型
-        special_violations = self._check_special_queries(sql_query)
+        special_violations = cls._check_special_queries(normalized_sql, allowed_database, access_level)
         violations.extend(special_violations)
 
         # 检查数据库创建/删除操作
-        ddl_violations = self._check_ddl_operations(sql_query)
+        ddl_violations = cls._check_ddl_operations(normalized_sql, allowed_database, access_level)
         violations.extend(ddl_violations)
 
-        is_allowed = len(violations) == 0
-
-        if violations:
-            logger.warning(f"数据库范围检查失败: {violations}")
-
-        return is_allowed, violations
+        return tuple(violations)
 
     def enforce_query(self, sql_query: str) -> None:
         """
@@ -148,99 +191,110 @@ class DatabaseScopeChecker:
                 violations
             )
 
-    def _extract_databases(self, sql_query: str) -> Set[str]:
-        """提取SQL查询中涉及的数据库名称"""
+    async def enforce_query_async(self, sql_query: str) -> None:
+        """enforce_query 的异步版本，长 SQL 在线程中检查"""
+        is_allowed, violations = await self.check_query_async(sql_query)
+        if not is_allowed:
+            raise DatabaseScopeViolation(
+                f"数据库范围违规: {len(violations)}个问题",
+                violations
+            )
+
+    @staticmethod
+    def _normalize_sql(sql_query: str) -> str:
+        """转为大写并将连续空白压缩为单个空格"""
+        return ' '.join(sql_query.upper().split())
+
+    @classmethod
+    def _extract_databases(cls, normalized_sql: str) -> Set[str]:
+        """提取规范化SQL中涉及的数据库名称"""
         databases: Set[str] = set()
-        normalized_sql = re.sub(r'\s+', ' ', sql_query.upper().strip())
-
-        for pattern in self.CROSS_DB_PATTERNS:
-            try:
-                matches = re.finditer(pattern, normalized_sql, re.IGNORECASE)
-                for match in matches:
-                    # 处理匹配结果
-                    if match.groups():
-                        # 获取第一个捕获组（通常是数据库名）
-                        db_name = match.group(1).lower()
-
-                        # 验证数据库名称格式
-                        if self._is_valid_database_name(db_name):
-                            databases.add(db_name)
-            except re.error as e:
-                logger.warning(f"正则表达式错误: 模式={pattern}, 错误={str(e)}")
+
+        for match in cls.CROSS_DB_RE.finditer(normalized_sql):
+            # 每个子模式只有一个捕获组，即命中分支的数据库名
+            db_name = match.group(match.lastgroup).lower()
+
+            # 验证数据库名称格式
+            if cls._is_valid_database_name(db_name):
+                databases.add(db_name)
 
         return databases
 
-    def _is_valid_database_name(self, name: str) -> bool:
+    @staticmethod
+    def _is_valid_database_name(name: str) -> bool:
         """检查是否是有效的数据库名称"""
-        # 数据库名称规则：字母、数字、下划线，不能以数字开头
-        return bool(re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', name))
+        # 数据库名称规则：字母、数字、下划线，不能以数字开头；限定 ASCII 后与 Python 标识符规则一致
+        return name.isascii() and name.isidentifier()
 
-    def _is_database_allowed(self, db_name: str) -> bool:
+    @classmethod
+    def _is_database_allowed(cls, db_name: str, allowed_database: str, access_level: DatabaseAccessLevel) -> bool:
         """检查数据库是否被允许访问"""
         db_name_lower = db_name.lower()
 
         # 检查是否是允许的主数据库
-        if self.allowed_database and db_name_lower == self.allowed_database.lower():
+        if allowed_database and db_name_lower == allowed_database:
             return True
 
         # 根据访问级别决定是否允许系统数据库
-        if self.access_level == DatabaseAccessLevel.RESTRICTED:
-            if db_name_lower in self.SYSTEM_DATABASES:
+        if access_level is DatabaseAccessLevel.RESTRICTED:
+            if db_name_lower in cls.SYSTEM_DATABASES:
                 return True
 
         return False
 
-    def _check_special_queries(self, sql_query: str) -> List[str]:
+    @classmethod
+    def _check_special_queries(cls, normalized_sql: str, allowed_database: str,
+                               access_level: DatabaseAccessLevel) -> List[str]:
         """检查特殊类型的查询"""
         violations = []
-        normalized_sql = sql_query.upper().strip()
+        is_strict = access_level is DatabaseAccessLevel.STRICT
 
         # 检查SHOW DATABASES查询
-        if re.search(self.SPECIAL_QUERY_PATTERNS['SHOW_DATABASES'], normalized_sql):
-            if self.access_level == DatabaseAccessLevel.STRICT:
+        if cls.SHOW_DATABASES_RE.search(normalized_sql):
+            if is_strict:
                 violations.append("严格模式下不允许执行 SHOW DATABASES")
 
         # 检查USE语句
-        use_match = re.search(self.SPECIAL_QUERY_PATTERNS['USE_STATEMENT'], normalized_sql)
+        use_match = cls.USE_STATEMENT_RE.search(normalized_sql)
         if use_match:
             db_name = use_match.group(1).lower()
-            if not self._is_database_allowed(db_name):
+            if not cls._is_database_allowed(db_name, allowed_database, access_level):
                 violations.append(f"不允许使用 USE 语句切换到数据库: {db_name}")
 
-        # 检查系统表访问
-        for pattern in self.SPECIAL_QUERY_PATTERNS['SYSTEM_TABLE_ACCESS']:
-            if re.search(pattern, normalized_sql, re.IGNORECASE):
-                if self.access_level == DatabaseAccessLevel.STRICT:
-                    violations.append("严格模式下不允许访问系统表")
-                    break
+        # 检查系统表访问（仅严格模式限制）：先用字面子串预过滤，命中后再用正则确认单词边界
+        if is_strict and any(prefix in normalized_sql for prefix in cls.SYSTEM_TABLE_PREFIXES):
+            if cls.SYSTEM_TABLE_ACCESS_RE.search(normalized_sql):
+                violations.append("严格模式下不允许访问系统表")
 
         return violations
 
-    def _check_ddl_operations(self, sql_query: str) -> List[str]:
+    @classmethod
+    def _check_ddl_operations(cls, normalized_sql: str, allowed_database: str,
+                              access_level: DatabaseAccessLevel) -> List[str]:
         """检查数据库DDL操作"""
         violations = []
-        normalized_sql = sql_query.upper().strip()
+        is_permissive = access_level is DatabaseAccessLevel.PERMISSIVE
 
         # 检查CREATE DATABASE
-        create_match = re.search(r'\bCREATE\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', normalized_sql)
+        create_match = cls.CREATE_DATABASE_RE.search(normalized_sql)
         if create_match:
-            if self.access_level != DatabaseAccessLevel.PERMISSIVE:
+            if not is_permissive:
                 violations.append("非宽松模式下不允许创建数据库")
 
         # 检查DROP DATABASE
-        drop_match = re.search(r'\bDROP\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', normalized_sql)
+        drop_match = cls.DROP_DATABASE_RE.search(normalized_sql)
         if drop_match:
             db_name = drop_match.group(1).lower()
-            if db_name == self.allowed_database.lower():
+            if db_name == allowed_database:
                 violations.append("不允许删除当前使用的数据库")
-            elif self.access_level != DatabaseAccessLevel.PERMISSIVE:
+            elif not is_permissive:
                 violations.append("非宽松模式下不允许删除数据库")
 
         # 检查ALTER DATABASE
-        alter_match = re.search(r'\bALTER\s+DATABASE\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', normalized_sql)
+        alter_match = cls.ALTER_DATABASE_RE.search(normalized_sql)
         if alter_match:
             db_name = alter_match.group(1).lower()
-            if db_name != self.allowed_database.lower() and self.access_level != DatabaseAccessLevel.PERMISSIVE:
+            if db_name != allowed_database and not is_permissive:
                 violations.append("非宽松模式下不允许修改其他数据库")
 
         return violations
@@ -249,20 +303,27 @@ class DatabaseScopeChecker:
         """获取允许访问的数据库列表"""
         allowed = set()
 
-        if self.allowed_database:
-            allowed.add(self.allowed_database.lower())
+        if self._allowed_database_lower:
+            allowed.add(self._allowed_database_lower)
 
-        if self.access_level == DatabaseAccessLevel.RESTRICTED:
+        if self._is_restricted:
             allowed.update(self.SYSTEM_DATABASES)
 
         return allowed
 
-    def is_cross_database_query(self, sql_query: str) -> bool:
-        """检查是否是跨数据库查询"""
-        referenced_dbs = self._extract_databases(sql_query)
+    def is_cross_database_query(self, sql_query: str, referenced_dbs: Optional[Set[str]] = None) -> bool:
+        """
+        检查是否是跨数据库查询
+
+        Args:
+            sql_query: SQL查询语句
+            referenced_dbs: 已提取的数据库名称集合，提供时不再重复提取
+        """
+        if referenced_dbs is None:
+            referenced_dbs = self._extract_databases(self._normalize_sql(sql_query))
         return len(referenced_dbs) > 1 or (
                 len(referenced_dbs) == 1 and
-                next(iter(referenced_dbs)) != self.allowed_database.lower()
+                next(iter(referenced_dbs)) != self._allowed_database_lower
         )
 
     def get_database_access_report(self, sql_query: str) -> Dict[str, Any]:
@@ -275,16 +336,25 @@ class DatabaseScopeChecker:
         Returns:
             dict: 包含数据库访问详细信息的字典
         """
-        referenced_dbs = self._extract_databases(sql_query)
+        # 数据库名称只提取一次；违规详情直接取检查结果缓存，不重复记录告警日志
+        referenced_dbs = self._extract_databases(self._normalize_sql(sql_query))
         allowed_dbs = self.get_allowed_databases()
+        violations = list(_check_query_impl(sql_query, self._allowed_database_lower,
+                                            self.access_level)) if self.is_enabled else []
 
         return {
             'query': sql_query,
             'referenced_databases': list(referenced_dbs),
             'allowed_databases': list(allowed_dbs),
-            'is_cross_database': self.is_cross_database_query(sql_query),
-            'violations': self.check_query(sql_query)[1],
+            'is_cross_database': self.is_cross_database_query(sql_query, referenced_dbs),
+            'violations': violations,
             'access_level': self.access_level.value,
             'allowed_database': self.allowed_database,
             'is_enabled': self.is_enabled
         }
+
+
+@lru_cache(maxsize=DatabaseScopeChecker.CHECK_CACHE_SIZE)
+def _check_query_impl(sql_query: str, allowed_database: str, access_level: DatabaseAccessLevel) -> Tuple[str, ...]:
+    """按 SQL 与 (允许的数据库, 访问级别) 缓存范围检查结果，每个请求 / 会话新建的检查器共用同一份缓存"""
+    return DatabaseScopeChecker._collect_violations(sql_query, allowed_database, access_level)
@@ -1,8 +1,10 @@
-import re
-from typing import Dict, Any
+import asyncio
+import itertools
+import sys
+from typing import Dict, Any, Optional, Tuple
 
 from mcp_for_db import LOG_LEVEL
-from mcp_for_db.server.server_mysql.config import SessionConfigManager
+from mcp_for_db.server.server_mysql.config import SessionConfigManager, BLOCKED_MATCH_REGEX
 from mcp_for_db.server.core import SQLRiskLevel, EnvironmentType
 from mcp_for_db.server.shared.security.sql_parser import SQLParser
 from mcp_for_db.server.shared.utils import get_logger, configure_logger
@@ -11,10 +13,56 @@ logger = get_logger(__name__)
 configure_logger(log_filename="mcp_sql_security.log")
 logger.setLevel(LOG_LEVEL)
 
+# 热路径上做成员判断的操作集合，模块加载时构造一次
+_DDL_CRITICAL_OPS = frozenset({'DROP', 'TRUNCATE'})
+_DDL_HIGH_OPS = frozenset({'ALTER', 'RENAME'})
+_DML_NEEDS_WHERE = frozenset({'UPDATE', 'DELETE'})
+_READ_ONLY_OPS = frozenset({'SELECT', 'SHOW', 'DESCRIBE', 'EXPLAIN'})
+_DANGEROUS_RISK_LEVELS = frozenset({SQLRiskLevel.HIGH, SQLRiskLevel.CRITICAL})
+
+# 预估影响行数“无上限”的整数哨兵值，保持结果为 int 且可直接序列化为 JSON
+_UNBOUNDED = sys.maxsize
+
+
+def _build_rows_table(ddl, dml_no_where, dml_where, insert, select_no_limit,
+                      select_limit) -> Dict[Tuple[str, bool, bool], int]:
+    """生成预估影响行数查找表：(操作键, has_where, has_limit) -> 行数，DDL 操作统一以 'DDL' 为键"""
+    table = {}
+    for has_where, has_limit in itertools.product((False, True), repeat=2):
+        table[('DDL', has_where, has_limit)] = ddl
+        for operation in _DML_NEEDS_WHERE:
+            table[(operation, has_where, has_limit)] = dml_where if has_where else dml_no_where
+        table[('INSERT', has_where, has_limit)] = insert  # 每次插入一行
+        table[('SELECT', has_where, has_limit)] = select_limit if has_limit else select_no_limit
+    return table
+
+
+# 生产环境按最坏情况估算，DDL 操作影响整个表
+_PRODUCTION_ROWS = _build_rows_table(_UNBOUNDED, _UNBOUNDED, 1000, 1, _UNBOUNDED, 100)
+# 开发环境更宽松
+_DEVELOPMENT_ROWS = _build_rows_table(1000, 10000, 100, 1, 1000, 100)
+
+# 风险等级查找表：(是否 DDL, 操作类型, 是否有 WHERE) -> 风险等级，未命中的操作（如 CREATE、INSERT）为中等风险
+_RISK_TABLE: Dict[Tuple[bool, str, bool], SQLRiskLevel] = {
+    # DDL 操作
+    **{(True, op, w): SQLRiskLevel.CRITICAL for op in _DDL_CRITICAL_OPS for w in (False, True)},
+    **{(True, op, w): SQLRiskLevel.HIGH for op in _DDL_HIGH_OPS for w in (False, True)},
+    # DML 操作：不带 WHERE 的更新、删除为高风险
+    **{(False, op, w): SQLRiskLevel.MEDIUM if w else SQLRiskLevel.HIGH
+       for op in _DML_NEEDS_WHERE for w in (False, True)},
+    # 查询与元数据操作
+    **{(False, op, w): SQLRiskLevel.LOW for op in _READ_ONLY_OPS for w in (False, True)},
+}
+
 
 class SQLRiskAnalyzer:
     """SQL风险分析器，评估SQL操作的安全风险"""
 
+    __slots__ = ('session_config', 'sql_parser', '_is_production', '_impact_rows')
+
+    # 异步分析时达到该长度的 SQL 放到线程中执行，避免阻塞事件循环
+    ASYNC_OFFLOAD_MIN_LENGTH = 16 * 1024
+
     def __init__(self, session_config: SessionConfigManager):
         """
         初始化风险分析器
@@ -25,26 +73,32 @@ class SQLRiskAnalyzer:
         self.session_config = session_config
         self.sql_parser = SQLParser(session_config)
 
+        # 环境类型在会话内不变，初始化时选定影响估算表
+        self._is_production = session_config.get('ENV_TYPE') == EnvironmentType.PRODUCTION.value
+        self._impact_rows = _PRODUCTION_ROWS if self._is_production else _DEVELOPMENT_ROWS
+
         logger.info("SQL风险分析器初始化完成")
 
-    def analyze_risk(self, sql_query: str) -> Dict[str, Any]:
+    def analyze_risk(self, sql_query: str, parsed_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         分析SQL查询的风险
 
         Args:
             sql_query: SQL查询语句
+            parsed_result: 调用方已得到的 SQLParser 解析结果，提供时不再重复解析
 
         Returns:
             dict: 包含风险分析结果的字典
         """
         # 解析SQL
-        parsed_result = self.sql_parser.parse_query(sql_query)
+        if parsed_result is None:
+            parsed_result = self.sql_parser.parse_query(sql_query)
 
         # 确定风险等级
         risk_level = self._determine_risk_level(parsed_result)
 
         # 检查是否是危险操作
-        is_dangerous = risk_level in {SQLRiskLevel.HIGH, SQLRiskLevel.CRITICAL}
+        is_dangerous = risk_level in _DANGEROUS_RISK_LEVELS
 
         # 检查是否允许执行
         allowed_risk_levels = self.session_config.get('MYSQL_ALLOWED_RISK_LEVELS', set())
@@ -70,40 +124,21 @@ class SQLRiskAnalyzer:
             'has_limit': parsed_result['has_limit']
         }
 
+    async def analyze_risk_async(self, sql_query: str,
+                                 parsed_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """analyze_risk 的异步版本，长 SQL 在线程中分析"""
+        if len(sql_query) < self.ASYNC_OFFLOAD_MIN_LENGTH:
+            return self.analyze_risk(sql_query, parsed_result)
+        return await asyncio.to_thread(self.analyze_risk, sql_query, parsed_result)
+
     def _determine_risk_level(self, parsed_result: Dict[str, Any]) -> SQLRiskLevel:
         """根据解析结果确定风险等级"""
-        op_type = parsed_result['operation_type'].upper()
-        category = parsed_result['category'].upper()
-
-        # DDL 操作
-        if category == 'DDL':
-            if op_type in {'DROP', 'TRUNCATE'}:
-                return SQLRiskLevel.CRITICAL
-            elif op_type in {'ALTER', 'RENAME'}:
-                return SQLRiskLevel.HIGH
-            else:  # CREATE
-                return SQLRiskLevel.MEDIUM
-
-        # DML 操作
-        if op_type == 'DELETE':
-            if not parsed_result['has_where']:
-                return SQLRiskLevel.HIGH
-            return SQLRiskLevel.MEDIUM
-        elif op_type == 'UPDATE':
-            if not parsed_result['has_where']:
-                return SQLRiskLevel.HIGH
-            return SQLRiskLevel.MEDIUM
-        elif op_type == 'INSERT':
-            return SQLRiskLevel.MEDIUM
-        elif op_type == 'SELECT':
-            return SQLRiskLevel.LOW
-
-        # 元数据操作
-        if op_type in {'SHOW', 'DESCRIBE', 'EXPLAIN'}:
-            return SQLRiskLevel.LOW
+        key = (parsed_result['category'].upper() == 'DDL',
+               parsed_result['operation_type'].upper(),
+               bool(parsed_result['has_where']))
 
         # 其他操作默认为中等风险
-        return SQLRiskLevel.MEDIUM
+        return _RISK_TABLE.get(key, SQLRiskLevel.MEDIUM)
 
     def _estimate_impact(self, parsed_result: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -123,38 +158,19 @@ class SQLRiskAnalyzer:
 
         impact = {
             'operation': operation,
-            'needs_where': operation in {'UPDATE', 'DELETE'},
+            'needs_where': operation in _DML_NEEDS_WHERE,
             'has_where': has_where,
             'needs_limit': operation == 'SELECT',
             'has_limit': has_limit,
             'is_multi_statement': is_multi,
-            'estimated_rows': 0
+            # 根据环境类型查表估算
+            'estimated_rows': self._impact_rows.get(
+                ('DDL' if category == 'DDL' else operation, bool(has_where), bool(has_limit)), 0)
         }
 
-        # 根据环境类型调整估算
-        if self.config.get("ENV_TYPE") == EnvironmentType.PRODUCTION:
-            if category == 'DDL':
-                impact['estimated_rows'] = int('inf')  # DDL 操作影响整个表
-            elif operation in {'UPDATE', 'DELETE'}:
-                impact['estimated_rows'] = float('inf') if not has_where else 1000
-            elif operation == 'INSERT':
-                impact['estimated_rows'] = 1  # 每次插入一行
-            elif operation == 'SELECT':
-                impact['estimated_rows'] = float('inf') if not has_limit else 100
-        else:
-            # 开发环境更宽松
-            if category == 'DDL':
-                impact['estimated_rows'] = 1000
-            elif operation in {'UPDATE', 'DELETE'}:
-                impact['estimated_rows'] = 10000 if not has_where else 100
-            elif operation == 'INSERT':
-                impact['estimated_rows'] = 1
-            elif operation == 'SELECT':
-                impact['estimated_rows'] = 1000 if not has_limit else 100
-
         # 多语句查询影响更大
         if is_multi:
-            impact['estimated_rows'] *= parsed_result['statement_count']
+            impact['estimated_rows'] = min(impact['estimated_rows'] * parsed_result['statement_count'], _UNBOUNDED)
 
         return impact
 
@@ -193,7 +209,7 @@ class SQLRiskAnalyzer:
             # 简单影响评估
             impact = {
                 'operation': parsed_result['operation_type'],
-                'needs_where': parsed_result['operation_type'] in {'UPDATE', 'DELETE'},
+                'needs_where': parsed_result['operation_type'] in _DML_NEEDS_WHERE,
                 'has_where': parsed_result['has_where'],
                 'needs_limit': parsed_result['operation_type'] == 'SELECT',
                 'has_limit': parsed_result['has_limit'],
@@ -205,9 +221,9 @@ class SQLRiskAnalyzer:
             risk_level = SQLRiskLevel.MEDIUM
             if is_dangerous:
                 risk_level = SQLRiskLevel.CRITICAL
-            elif parsed_result['operation_type'] in {'DROP', 'TRUNCATE'}:
+            elif parsed_result['operation_type'] in _DDL_CRITICAL_OPS:
                 risk_level = SQLRiskLevel.CRITICAL
-            elif parsed_result['operation_type'] in {'DELETE', 'UPDATE'} and not parsed_result['has_where']:
+            elif parsed_result['operation_type'] in _DML_NEEDS_WHERE and not parsed_result['has_where']:
                 risk_level = SQLRiskLevel.HIGH
 
             return {
@@ -230,18 +246,13 @@ class SQLRiskAnalyzer:
         """检查是否匹配危险操作模式"""
         sql_upper = sql_query.upper()
 
-        # 检查阻止的模式
-        for pattern in self.session_config.get("MYSQL_BLOCKED_PATTERNS"):
-            if re.search(pattern, sql_upper, re.IGNORECASE):
-                return True
-
-        # 检查高风险操作
-        high_risk_ops = {'DROP', 'TRUNCATE', 'DELETE', 'UPDATE'}
-        if any(op in sql_upper for op in high_risk_ops):
-            # 检查是否有 WHERE 子句
-            if 'DELETE' in sql_upper or 'UPDATE' in sql_upper:
-                if 'WHERE' not in sql_upper:
-                    return True
+        # 检查阻止的模式（按正则匹配）
+        if self.session_config.match_blocked(sql_upper, BLOCKED_MATCH_REGEX):
+            return True
+
+        # 检查不带 WHERE 子句的删除、更新操作
+        if any(op in sql_upper for op in _DML_NEEDS_WHERE) and 'WHERE' not in sql_upper:
+            return True
 
         return False
 
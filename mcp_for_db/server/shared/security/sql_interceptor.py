@@ -1,9 +1,8 @@
-import re
 from typing import Dict, Any, Optional
 import asyncio
 
 from mcp_for_db import LOG_LEVEL
-from mcp_for_db.server.server_mysql.config import SessionConfigManager
+from mcp_for_db.server.server_mysql.config import SessionConfigManager, BLOCKED_MATCH_WORD
 from mcp_for_db.server.shared.security.sql_parser import SQLParser
 from mcp_for_db.server.shared.security.db_scope_check import DatabaseScopeChecker, DatabaseScopeViolation
 from mcp_for_db.server.shared.security.sql_analyzer import SQLRiskAnalyzer
@@ -56,12 +55,13 @@ class SQLInterceptor:
 
         logger.info("SQL拦截器初始化完成")
 
-    async def check_operation(self, sql_query: str) -> Dict[str, Any]:
+    async def check_operation(self, sql_query: str, parsed_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         全面检查SQL操作是否允许执行，返回详细检查结果
 
         Args:
             sql_query: SQL查询语句
+            parsed_result: 调用方已得到的 SQLParser 解析结果，提供时各步骤共用，不再重复解析
 
         Returns:
             dict: 包含详细检查结果的字典
@@ -86,13 +86,13 @@ class SQLInterceptor:
             self._check_basic_sql(sql_query, result)
 
             # 步骤2: 解析SQL
-            parsed_result = self._parse_sql(sql_query, result)
+            parsed_result = self._parse_sql(sql_query, result, parsed_result)
 
             # 步骤3: 数据库范围检查
-            self._check_database_scope(sql_query, result)
+            await self._check_database_scope(sql_query, result)
 
             # 步骤4: 风险分析
-            risk_analysis = self._analyze_risk(sql_query, parsed_result, result)
+            risk_analysis = await self._analyze_risk(sql_query, parsed_result, result)
 
             # 步骤5: 最终决策
             self._make_final_decision(result, risk_analysis)
@@ -145,28 +145,15 @@ class SQLInterceptor:
 
     def _should_block_sql(self, sql_query: str) -> bool:
         """检查SQL是否包含被阻止的模式"""
-        blocked_patterns = self.session_config.get('MYSQL_BLOCKED_PATTERNS', [])
-        if not blocked_patterns:
-            return False
-
-        # 确保 blocked_patterns 是列表
-        if isinstance(blocked_patterns, str):
-            blocked_patterns = [p.strip().upper() for p in blocked_patterns.split(',') if p.strip()]
-
-        sql_upper = sql_query.upper()
-
-        # 检查每个阻止模式
-        for pattern in blocked_patterns:
-            # 使用正则表达式确保模式是独立的单词
-            if re.search(rf'\b{re.escape(pattern)}\b', sql_upper):
-                return True
-
-        return False
+        # 模式须是独立的单词；匹配器由会话配置预编译，阻止模式变更后自动重建
+        return self.session_config.match_blocked(sql_query, BLOCKED_MATCH_WORD)
 
-    def _parse_sql(self, sql_query: str, result: Dict[str, Any]) -> Dict[str, Any]:
-        """解析SQL并更新结果"""
+    def _parse_sql(self, sql_query: str, result: Dict[str, Any],
+                   parsed_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """解析SQL并更新结果，已有解析结果时直接复用"""
         try:
-            parsed_result = self.sql_parser.parse_query(sql_query)
+            if parsed_result is None:
+                parsed_result = self.sql_parser.parse_query(sql_query)
             result.update({
                 'operation_type': parsed_result['operation_type'],
                 'category': parsed_result['category'],
@@ -199,14 +186,14 @@ class SQLInterceptor:
         except Exception as e:
             raise SQLOperationException(f"SQL解析失败: {str(e)}")
 
-    def _check_database_scope(self, sql_query: str, result: Dict[str, Any]) -> None:
+    async def _check_database_scope(self, sql_query: str, result: Dict[str, Any]) -> None:
         """执行数据库范围检查"""
         if not self.database_checker:
             return
 
         try:
             # 检查数据库范围
-            is_allowed, violations = self.database_checker.check_query(sql_query)
+            is_allowed, violations = await self.database_checker.check_query_async(sql_query)
             result['database_violations'] = violations
 
             if not is_allowed:
@@ -225,10 +212,11 @@ class SQLInterceptor:
         except Exception as e:
             raise SQLOperationException(f"数据库范围检查失败: {str(e)}")
 
-    def _analyze_risk(self, sql_query: str, parsed_result: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_risk(self, sql_query: str, parsed_result: Dict[str, Any],
+                            result: Dict[str, Any]) -> Dict[str, Any]:
         """执行风险分析"""
         try:
-            risk_analysis = self.risk_analyzer.analyze_risk(sql_query)
+            risk_analysis = await self.risk_analyzer.analyze_risk_async(sql_query, parsed_result)
             result.update({
                 'risk_level': risk_analysis['risk_level'],
                 'is_dangerous': risk_analysis['is_dangerous'],
@@ -341,7 +329,7 @@ class SQLInterceptor:
                 report['database_check'] = self.database_checker.get_database_access_report(sql_query)
 
             # 风险分析
-            report['risk_analysis'] = self.risk_analyzer.analyze_risk(sql_query)
+            report['risk_analysis'] = self.risk_analyzer.analyze_risk(sql_query, report['parsing_result'])
 
             # 最终决策
             report['decision'] = 'ALLOWED' if self._is_operation_allowed(report) else 'DENIED'
@@ -1,6 +1,9 @@
 import sqlparse
+import functools
 import re
-from typing import List, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 
 from mcp_for_db import LOG_LEVEL
 from mcp_for_db.server.server_mysql.config import SessionConfigManager
@@ -11,12 +14,38 @@ logger = get_logger(__name__)
 configure_logger(log_filename="mcp_sql_security.log")
 logger.setLevel(LOG_LEVEL)
 
+# 数字字面量（字符串字面量原样跳过：表名、WHERE 等检测会读取字符串内容，不能归一化）
+_NUMBER_LITERAL_RE = re.compile(r"('(?:[^']|'')*')|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r'\?')
+# 含注释、反斜杠转义、引号标识符、占位符或多条语句的 SQL 不做字面量归一化，只按原文缓存
+_TEMPLATE_UNSAFE_MARKERS = ('--', '#', '/*', '\\', '"', '`', '?', ';')
+# 占位符处在首个词、SHOW 后或表名位置时，数字会进入操作类型或表名，同样不能归一化
+_TEMPLATE_UNSAFE_RE = re.compile(r'^[\s(]*\?|\bSHOW\s+\?|\b(?:FROM|JOIN|UPDATE|INTO|TABLE)\s+[\w.]*\?', re.IGNORECASE)
+
+# 敏感信息关键字，编译为单个多选正则，一次扫描完成所有关键字的匹配
+_SENSITIVE_INFO_RE = re.compile(r'password|passwd|secret|token|credit|card|ssn')
+
+# 只有数字字面量不同的 SQL 共用解析结果: 字面量模板 -> (解析结果, 格式化后的字面量模板)，进程内所有解析器共用
+_template_cache: "OrderedDict[str, Tuple[Dict[str, Any], str]]" = OrderedDict()
+# 长 SQL 的安全检查会经 asyncio.to_thread 在线程中解析，模板缓存的读写须加锁
+_template_cache_lock = threading.Lock()
+
 
 class SQLParser:
     """
     SQL 解析器，提供较为健壮的 SQL 解析和安全分析功能
     """
 
+    # 进程内缓存的解析结果条数（所有解析器共用）
+    PARSE_CACHE_SIZE = 1024
+
+    # 操作类型集合
+    DDL_OPERATIONS = frozenset({'CREATE', 'ALTER', 'DROP', 'TRUNCATE', 'RENAME'})
+    DML_OPERATIONS = frozenset({'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE'})
+    METADATA_OPERATIONS = frozenset({'SHOW', 'DESC', 'DESCRIBE', 'EXPLAIN', 'HELP', 'ANALYZE', 'CHECK', 'CHECKSUM',
+                                     'OPTIMIZE', 'SET', 'USE', 'BEGIN', 'COMMIT', 'ROLLBACK', 'START', 'KILL'})
+    PROCEDURE_OPERATIONS = frozenset({'CALL', 'EXECUTE', 'EXEC'})
+
     def __init__(self, session_config: SessionConfigManager):
         """
         初始化 SQL 解析器
@@ -24,12 +53,11 @@ class SQLParser:
         """
         self.session_config = session_config
 
-        # 定义操作类型集合
-        self.ddl_operations = {'CREATE', 'ALTER', 'DROP', 'TRUNCATE', 'RENAME'}
-        self.dml_operations = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE'}
-        self.metadata_operations = {'SHOW', 'DESC', 'DESCRIBE', 'EXPLAIN', 'HELP', 'ANALYZE', 'CHECK', 'CHECKSUM',
-                                    'OPTIMIZE', 'SET', 'USE', 'BEGIN', 'COMMIT', 'ROLLBACK', 'START', 'KILL'}
-        self.procedure_operations = {'CALL', 'EXECUTE', 'EXEC'}
+        # 操作类型集合（类级常量，保留实例属性供外部引用）
+        self.ddl_operations = self.DDL_OPERATIONS
+        self.dml_operations = self.DML_OPERATIONS
+        self.metadata_operations = self.METADATA_OPERATIONS
+        self.procedure_operations = self.PROCEDURE_OPERATIONS
 
     def parse_query(self, sql_query: str) -> Dict[str, Any]:
         """
@@ -39,29 +67,92 @@ class SQLParser:
             sql_query: SQL 查询语句
 
         Returns:
-            Dict: 包含解析结果的字典
+            Dict: 包含解析结果的字典（缓存结果的副本，调用方修改不影响缓存）
         """
+        template, literals = self._literal_template(sql_query)
+        if template is None:
+            return self._copy_result(_parse_query_cached(sql_query))
+
+        with _template_cache_lock:
+            cached = _template_cache.get(template)
+            if cached is not None:
+                _template_cache.move_to_end(template)
+        if cached is not None:
+            # 结构字段直接复用，SQL 文本字段按本次的字面量还原
+            result, formatted_template = cached
+            values = iter(literals)
+            formatted_sql = _PLACEHOLDER_RE.sub(lambda _: next(values), formatted_template)
+            return self._copy_result(result, normalized_query=formatted_sql, original_query=formatted_sql)
+
+        result = self._parse_query(sql_query)
+
+        # 仅缓存正常解析的单条语句，且格式化前后字面量一致，才能由模板准确还原
+        formatted_sql = result['normalized_query']
+        if 'has_subquery' in result and not result['multi_statement'] and result['original_query'] == formatted_sql:
+            formatted_template, formatted_literals = self._literal_template(formatted_sql)
+            if formatted_literals == literals:
+                with _template_cache_lock:
+                    _template_cache[template] = (result, formatted_template)
+                    if len(_template_cache) > self.PARSE_CACHE_SIZE:
+                        _template_cache.popitem(last=False)
+        return self._copy_result(result)
+
+    @staticmethod
+    def _copy_result(result: Dict[str, Any], **overrides: Any) -> Dict[str, Any]:
+        """复制缓存的解析结果，表名列表与子语句一并复制，调用方修改返回值不影响缓存"""
+        copied = dict(result, **overrides)
+        copied['tables'] = list(result['tables'])
+        if 'sub_statements' in result:
+            copied['sub_statements'] = [dict(sub, tables=list(sub['tables'])) for sub in result['sub_statements']]
+        return copied
+
+    @staticmethod
+    def _literal_template(sql_query: str) -> Tuple[Optional[str], List[str]]:
+        """
+        将数字字面量替换为占位符，返回 (模板, 按出现顺序的字面量)
+
+        不适合归一化或不含数字字面量时模板为 None
+        """
+        if any(marker in sql_query for marker in _TEMPLATE_UNSAFE_MARKERS):
+            return None, []
+
+        literals = []
+
+        def _replace(match: re.Match) -> str:
+            if match.group(1) is not None:
+                return match.group(1)
+            literals.append(match.group(0))
+            return '?'
+
+        template = _NUMBER_LITERAL_RE.sub(_replace, sql_query)
+        if not literals or _TEMPLATE_UNSAFE_RE.search(template):
+            return None, []
+        return template, literals
+
+    @classmethod
+    def _parse_query(cls, sql_query: str) -> Dict[str, Any]:
+        """解析 SQL 查询（不带缓存）"""
         if not sql_query or not sql_query.strip():
-            return self._empty_result()
+            return cls._empty_result()
 
         try:
             # 标准化和格式化 SQL
-            formatted_sql = self._format_sql(sql_query)
+            formatted_sql = cls._format_sql(sql_query)
 
             # 解析 SQL 语句
             parsed = sqlparse.parse(formatted_sql)
 
             # 处理多语句 SQL
             if len(parsed) > 1:
-                return self._process_multi_statement(parsed)
+                return cls._process_multi_statement(parsed)
 
             # 单语句处理
             stmt = parsed[0]
-            return self._process_single_statement(stmt, formatted_sql)
+            return cls._process_single_statement(stmt, formatted_sql)
 
         except Exception as e:
             logger.warning(f"SQL解析错误: {str(e)}")
-            return self._fallback_parse(sql_query)
+            return cls._fallback_parse(sql_query)
 
     def analyze_security(self, parsed_result: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -114,7 +205,8 @@ class SQLParser:
 
         return analysis
 
-    def _format_sql(self, sql_query: str) -> str:
+    @staticmethod
+    def _format_sql(sql_query: str) -> str:
         """标准化 SQL 查询格式"""
         # 去除多余空白和注释
         return sqlparse.format(
@@ -124,25 +216,26 @@ class SQLParser:
             keyword_case='upper'
         )
 
-    def _process_single_statement(self, stmt: sqlparse.sql.Statement, formatted_sql: str) -> Dict[str, Any]:
+    @classmethod
+    def _process_single_statement(cls, stmt: sqlparse.sql.Statement, formatted_sql: str) -> Dict[str, Any]:
         """处理单个 SQL 语句（增强版）"""
         # 获取操作类型
-        operation_type = self._get_operation_type(stmt)
+        operation_type = cls._get_operation_type(stmt)
 
         # 确定操作类别
-        category = self._get_operation_category(operation_type)
+        category = cls._get_operation_category(operation_type)
 
         # 提取表名
-        tables = self._extract_tables(stmt)
+        tables = cls._extract_tables(stmt)
 
         # 检查 WHERE 子句
-        has_where = self._has_where_clause(stmt)
+        has_where = cls._has_where_clause(stmt)
 
         # 检查 LIMIT 子句
-        has_limit = self._has_limit_clause(stmt)
+        has_limit = cls._has_limit_clause(stmt)
 
         # 检查子查询
-        has_subquery = self._has_subquery(stmt)
+        has_subquery = cls._has_subquery(stmt)
 
         return {
             'operation_type': operation_type,
@@ -158,13 +251,14 @@ class SQLParser:
             'has_subquery': has_subquery
         }
 
-    def _process_multi_statement(self, statements: List[sqlparse.sql.Statement]) -> Dict[str, Any]:
+    @classmethod
+    def _process_multi_statement(cls, statements: List[sqlparse.sql.Statement]) -> Dict[str, Any]:
         """处理多语句 SQL"""
         # 收集所有语句的信息
         results = []
         for stmt in statements:
-            formatted_sql = self._format_sql(stmt.value)
-            results.append(self._process_single_statement(stmt, formatted_sql))
+            formatted_sql = cls._format_sql(stmt.value)
+            results.append(cls._process_single_statement(stmt, formatted_sql))
 
         # 确定整体风险最高的操作类型和类别
         highest_risk_op = ''
@@ -172,7 +266,7 @@ class SQLParser:
         highest_risk_level = SQLRiskLevel.LOW
 
         for result in results:
-            risk_level = self._determine_risk_level(result)
+            risk_level = cls._determine_risk_level(result)
             if risk_level.value > highest_risk_level.value:
                 highest_risk_level = risk_level
                 highest_risk_op = result['operation_type']
@@ -201,7 +295,8 @@ class SQLParser:
             'sub_statements': results
         }
 
-    def _get_operation_type(self, stmt: sqlparse.sql.Statement) -> str:
+    @staticmethod
+    def _get_operation_type(stmt: sqlparse.sql.Statement) -> str:
         """获取 SQL 操作类型"""
         # 获取语句类型
         stmt_type = stmt.get_type()
@@ -255,20 +350,22 @@ class SQLParser:
 
         return "UNKNOWN"
 
-    def _get_operation_category(self, operation_type: str) -> str:
+    @classmethod
+    def _get_operation_category(cls, operation_type: str) -> str:
         """确定操作类别（DDL、DML 或元数据）"""
-        if operation_type in self.ddl_operations:
+        if operation_type in cls.DDL_OPERATIONS:
             return 'DDL'
-        elif operation_type in self.dml_operations:
+        elif operation_type in cls.DML_OPERATIONS:
             return 'DML'
-        elif operation_type in self.metadata_operations or operation_type.startswith('SHOW'):
+        elif operation_type in cls.METADATA_OPERATIONS or operation_type.startswith('SHOW'):
             return 'METADATA'
-        elif operation_type in self.procedure_operations:
+        elif operation_type in cls.PROCEDURE_OPERATIONS:
             return 'PROCEDURE'
         else:
             return 'UNKNOWN'
 
-    def _extract_tables(self, stmt: sqlparse.sql.Statement) -> List[str]:
+    @staticmethod
+    def _extract_tables(stmt: sqlparse.sql.Statement) -> List[str]:
         """从 SQL 语句中提取所有表名（增强版）"""
         tables = set()
         sql_str = str(stmt).upper()
@@ -354,7 +451,8 @@ class SQLParser:
 
         return list(tables)
 
-    def _has_where_clause(self, stmt: sqlparse.sql.Statement) -> bool:
+    @staticmethod
+    def _has_where_clause(stmt: sqlparse.sql.Statement) -> bool:
         """检查 SQL 语句是否包含 WHERE 子句（增强版）"""
         # SHOW 语句通常没有 WHERE 子句
         sql_str = str(stmt).upper()
@@ -364,7 +462,8 @@ class SQLParser:
         # 使用正则表达式检查 WHERE 关键字
         return 'WHERE' in sql_str
 
-    def _has_limit_clause(self, stmt: sqlparse.sql.Statement) -> bool:
+    @staticmethod
+    def _has_limit_clause(stmt: sqlparse.sql.Statement) -> bool:
         """检查 SQL 语句是否包含 LIMIT 子句（增强版）"""
         # SHOW 语句通常没有 LIMIT 子句
         sql_str = str(stmt).upper()
@@ -374,13 +473,15 @@ class SQLParser:
         # 使用正则表达式检查 LIMIT 关键字
         return 'LIMIT' in sql_str
 
-    def _has_subquery(self, stmt: sqlparse.sql.Statement) -> bool:
+    @staticmethod
+    def _has_subquery(stmt: sqlparse.sql.Statement) -> bool:
         """检查 SQL 语句是否包含子查询"""
         # 使用正则表达式检查子查询模式
         sql_str = str(stmt).upper()
         return re.search(r'\bSELECT\s+.*?\bFROM\s+\(', sql_str) is not None
 
-    def _determine_risk_level(self, parsed_result: Dict[str, Any]) -> SQLRiskLevel:
+    @staticmethod
+    def _determine_risk_level(parsed_result: Dict[str, Any]) -> SQLRiskLevel:
         """根据解析结果确定风险等级（增强版）"""
         op_type = parsed_result['operation_type']
         category = parsed_result['category']
@@ -420,25 +521,26 @@ class SQLParser:
         if not blocked_patterns:
             return False
 
+        # 优先使用会话配置上预编译的匹配器，一次扫描完成所有模式的匹配
+        match_blocked = getattr(self.session_config, 'match_blocked', None)
+        if match_blocked is not None:
+            return match_blocked(sql_query)
+
         sql_upper = sql_query.upper()
         return any(pattern in sql_upper for pattern in blocked_patterns)
 
     def _contains_sensitive_info(self, parsed_result: Dict[str, Any]) -> bool:
         """检查 SQL 是否可能访问敏感信息"""
         # 简单的关键字检测
-        sensitive_keywords = {'password', 'passwd', 'secret', 'token', 'credit', 'card', 'ssn'}
+        search = _SENSITIVE_INFO_RE.search
 
         # 检查表名
         for table in parsed_result['tables']:
-            if any(kw in table.lower() for kw in sensitive_keywords):
+            if search(table.lower()):
                 return True
 
         # 检查 SQL 语句
-        sql_lower = parsed_result['original_query'].lower()
-        if any(kw in sql_lower for kw in sensitive_keywords):
-            return True
-
-        return False
+        return search(parsed_result['original_query'].lower()) is not None
 
     def _is_database_access_allowed(self, parsed_result: Dict[str, Any]) -> bool:
         """检查数据库访问是否符合隔离策略"""
@@ -469,7 +571,8 @@ class SQLParser:
 
         return True
 
-    def _fallback_parse(self, sql_query: str) -> Dict[str, Any]:
+    @classmethod
+    def _fallback_parse(cls, sql_query: str) -> Dict[str, Any]:
         """当高级解析失败时，回退到基本字符串解析"""
         sql_upper = sql_query.strip().upper()
         parts = sql_upper.split()
@@ -478,13 +581,13 @@ class SQLParser:
 
         # 确定操作类别
         category = 'UNKNOWN'
-        if operation_type in self.ddl_operations:
+        if operation_type in cls.DDL_OPERATIONS:
             category = 'DDL'
-        elif operation_type in self.dml_operations:
+        elif operation_type in cls.DML_OPERATIONS:
             category = 'DML'
-        elif operation_type in self.metadata_operations or operation_type.startswith('SHOW'):
+        elif operation_type in cls.METADATA_OPERATIONS or operation_type.startswith('SHOW'):
             category = 'METADATA'
-        elif operation_type in self.procedure_operations:
+        elif operation_type in cls.PROCEDURE_OPERATIONS:
             category = 'PROCEDURE'
 
         # 基本的表名提取
@@ -515,7 +618,8 @@ class SQLParser:
             'statement_count': sql_query.count(';') + 1 if sql_query.strip() else 0
         }
 
-    def _empty_result(self) -> Dict[str, Any]:
+    @staticmethod
+    def _empty_result() -> Dict[str, Any]:
         """返回空查询结果"""
         return {
             'operation_type': 'UNKNOWN',
@@ -531,6 +635,12 @@ class SQLParser:
         }
 
 
+@functools.lru_cache(maxsize=SQLParser.PARSE_CACHE_SIZE)
+def _parse_query_cached(sql_query: str) -> Dict[str, Any]:
+    """按 SQL 文本缓存解析结果：结果与会话配置无关，每个请求 / 会话新建的解析器共用同一份缓存"""
+    return SQLParser._parse_query(sql_query)
+
+
 if __name__ == '__main__':
     # 创建会话配置管理器
     session_config = SessionConfigManager({
@@ -1,3 +1,4 @@
+import re
 from typing import Tuple
 
 from mcp_for_db import LOG_LEVEL
@@ -9,6 +10,9 @@ logger = get_logger(__name__)
 configure_logger(log_filename="mcp_sql_security.log")
 logger.setLevel(LOG_LEVEL)
 
+# 敏感表名关键字，编译为单个多选正则
+_SENSITIVE_TABLE_RE = re.compile(r'user|password|admin|config')
+
 
 class QueryLimiter:
     """查询安全检查器，基于会话配置进行安全检查"""
@@ -117,10 +121,8 @@ class QueryLimiter:
                 return False, f"{operation_type}操作没有WHERE子句，存在安全风险"
 
         # 检查是否访问敏感表
-        sensitive_keywords = {'user', 'password', 'admin', 'config'}
         for table in parsed_sql.get('tables', []):
-            table_lower = table.lower()
-            if any(keyword in table_lower for keyword in sensitive_keywords):
+            if _SENSITIVE_TABLE_RE.search(table.lower()):
                 if operation_type in {'DROP', 'DELETE', 'UPDATE', 'ALTER'}:
                     return False, f"不允许对敏感表 {table} 执行 {operation_type} 操作"
 
@@ -1,6 +1,9 @@
 from .logger import get_logger, configure_logger
+from .json_utils import json_dumps, json_loads
 
 __all__ = [
     "get_logger",
     "configure_logger",
+    "json_dumps",
+    "json_loads",
 ]
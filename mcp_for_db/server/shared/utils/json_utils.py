@@ -0,0 +1,47 @@
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson  # 可选依赖: 更快的 JSON 序列化
+except ImportError:
+    orjson = None
+
+"""
+工具、资源返回结果的 JSON 序列化与解析：安装了 orjson 时优先使用，否则退回标准库 json
+"""
+
+
+def json_dumps(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """序列化为 JSON 字符串，保留非 ASCII 字符
+
+    Args:
+        obj: 待序列化对象
+        indent: 是否使用两个空格缩进
+        default: 无法直接序列化的对象的转换函数
+    """
+    if orjson is not None:
+        # 日期时间交给 default 处理，与标准库行为保持一致
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+        except TypeError:
+            # orjson 不支持的情况（如超出 64 位的整数）退回标准库
+            pass
+
+    # 与 orjson 输出保持一致: 不缩进时使用紧凑分隔符
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """解析 JSON 字符串
+
+    Raises:
+        ValueError: 内容不是合法的 JSON（orjson 与标准库的解析异常均为其子类）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -3,6 +3,9 @@ import logging
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
+# 当前根日志记录器使用的日志文件路径
+_configured_log_path = None
+
 
 def configure_logger(log_filename="app.logs"):
     """配置日志系统
@@ -15,6 +18,12 @@ def configure_logger(log_filename="app.logs"):
     os.makedirs(os.path.join(root_dir, "datas", "logs"), exist_ok=True)
     log_path = os.path.join(os.path.join(root_dir, "datas", "logs"), log_filename)
 
+    # 各模块导入时都会调用，目标文件未变化时无需重建处理器
+    global _configured_log_path
+    if log_path == _configured_log_path:
+        return
+    _configured_log_path = log_path
+
     # 设置日志格式
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s"
     formatter = logging.Formatter(log_format)
@@ -22,17 +31,19 @@ def configure_logger(log_filename="app.logs"):
     # 创建根日志记录器
     logger = logging.getLogger()
 
-    # 清除所有已有处理器
+    # 清除并关闭所有已有处理器，避免遗留打开的文件句柄
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+        handler.close()
 
-    # 创建并添加文件处理器（按天轮转，保留7天）
+    # 创建并添加文件处理器（按天轮转，保留7天），首次写入日志时才打开文件
     file_handler = TimedRotatingFileHandler(
         log_path,
         when="midnight",
         interval=1,
         backupCount=7,
-        encoding="utf-8"
+        encoding="utf-8",
+        delay=True
     )
     file_handler.setFormatter(formatter)
     logger.addHandler(file_handler)
@@ -0,0 +1,165 @@
+import asyncio
+from unittest import mock
+
+from mcp_for_db.server.server_mysql.config import SessionConfigManager, DatabaseManager
+from mcp_for_db.server.server_mysql.config import database
+
+SESSION_CONFIG = SessionConfigManager({
+    "MYSQL_HOST": "localhost",
+    "MYSQL_PORT": "13308",
+    "MYSQL_USER": "videx",
+    "MYSQL_PASSWORD": "password",
+    "MYSQL_DATABASE": "tpch_tiny"
+})
+
+
+class FakePool:
+    """只记录创建与关闭的连接池，不连接数据库"""
+
+    def __init__(self, **params):
+        self.params = params
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def _fake_create_pool(created):
+    async def create_pool(**params):
+        pool = FakePool(**params)
+        created.append(pool)
+        return pool
+
+    return mock.patch.object(database.aiomysql, "create_pool", create_pool)
+
+
+def test_requests_borrow_shared_pool():
+    """连接配置未变更的请求借用共享连接池: 不新建连接，归还时只减少借用计数"""
+
+    async def run():
+        created = []
+        with _fake_create_pool(created):
+            shared = DatabaseManager(SESSION_CONFIG.clone())
+            await shared.initialize_pool()
+            managers = [DatabaseManager(SESSION_CONFIG.clone(), shared) for _ in range(3)]
+            for manager in managers:
+                await manager.ensure_pool()
+                await manager.ensure_pool()
+
+            assert len(created) == 1
+            assert shared._borrowers == 3
+            assert all(manager._pool is created[0] for manager in managers)
+
+            for manager in managers:
+                await manager.close_pool()
+                await manager.close_pool()
+            assert shared._borrowers == 0
+            assert not created[0].closed
+
+            await shared.close_pool()
+            assert created[0].closed
+
+    asyncio.run(run())
+
+
+def test_switched_database_gets_private_pool():
+    """切换数据库后改用私有连接池，关闭时真正关闭，共享连接池不受影响"""
+
+    async def run():
+        created = []
+        with _fake_create_pool(created):
+            shared = DatabaseManager(SESSION_CONFIG.clone())
+            await shared.initialize_pool()
+            session_config = SESSION_CONFIG.clone()
+            manager = DatabaseManager(session_config, shared)
+            await manager.ensure_pool()
+            assert shared._borrowers == 1
+
+            session_config.update({"MYSQL_DATABASE": "other_db"})
+            await manager.initialize_pool()
+            assert len(created) == 2
+            assert manager._pool is created[1]
+            assert created[1].params["db"] == "other_db"
+            assert shared._borrowers == 0
+
+            await manager.close_pool()
+            assert created[1].closed
+            assert not created[0].closed
+            await shared.close_pool()
+
+    asyncio.run(run())
+
+
+def test_shared_pool_created_on_first_borrow():
+    """共享连接池尚未创建时，第一个借用的请求负责创建，之后的请求直接复用"""
+
+    async def run():
+        created = []
+        with _fake_create_pool(created):
+            shared = DatabaseManager(SESSION_CONFIG.clone())
+            first = DatabaseManager(SESSION_CONFIG.clone(), shared)
+            second = DatabaseManager(SESSION_CONFIG.clone(), shared)
+            await asyncio.gather(first.ensure_pool(), second.ensure_pool())
+
+            assert len(created) == 1
+            assert shared._borrowers == 2
+            await first.close_pool()
+            await second.close_pool()
+            await shared.close_pool()
+            assert created[0].closed
+
+    asyncio.run(run())
+
+
+def test_nested_holders_close_on_outermost_exit():
+    """嵌套持有同一连接池: 重复 ensure_pool 不新建连接，只有最外层退出时才关闭"""
+
+    async def run():
+        created = []
+        with _fake_create_pool(created):
+            manager = DatabaseManager(SESSION_CONFIG.clone())
+            async with manager:
+                async with manager:
+                    await manager.ensure_pool()
+                    assert manager._refcount == 2
+                assert manager._refcount == 1
+                assert not created[0].closed
+            assert manager._refcount == 0
+            assert len(created) == 1
+            assert created[0].closed
+
+    asyncio.run(run())
+
+
+def test_reset_rebuilds_pool_regardless_of_refcount():
+    """reset 强制按新配置重建连接池，持有方的引用计数保持不变"""
+
+    async def run():
+        created = []
+        with _fake_create_pool(created):
+            session_config = SESSION_CONFIG.clone()
+            manager = DatabaseManager(session_config)
+            async with manager:
+                async with manager:
+                    session_config.update({"MYSQL_DATABASE": "other_db"})
+                    await manager.reset()
+                    assert created[0].closed
+                    assert manager._pool is created[1]
+                    assert manager._refcount == 2
+                assert not created[1].closed
+            assert created[1].closed
+            assert len(created) == 2
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_requests_borrow_shared_pool()
+    test_switched_database_gets_private_pool()
+    test_shared_pool_created_on_first_borrow()
+    test_nested_holders_close_on_outermost_exit()
+    test_reset_rebuilds_pool_regardless_of_refcount()
+    print("数据库连接池测试通过")
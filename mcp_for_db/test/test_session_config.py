@@ -0,0 +1,71 @@
+from mcp_for_db.server.server_mysql.config import SessionConfigManager, BLOCKED_MATCH_SUBSTRING, \
+    BLOCKED_MATCH_WORD, BLOCKED_MATCH_REGEX
+
+
+def test_match_blocked_substring():
+    """子串方式: 不区分大小写，模式出现在单词内部也命中"""
+    config = SessionConfigManager({"MYSQL_BLOCKED_PATTERNS": "DROP TABLE,TRUNCATE"})
+    assert config.match_blocked("drop table t", BLOCKED_MATCH_SUBSTRING)
+    assert config.match_blocked("DROP TABLES", BLOCKED_MATCH_SUBSTRING)
+    assert config.match_blocked("select * from truncated", BLOCKED_MATCH_SUBSTRING)
+    assert not config.match_blocked("select 1", BLOCKED_MATCH_SUBSTRING)
+
+
+def test_match_blocked_word():
+    """单词方式: 模式须是独立的单词"""
+    config = SessionConfigManager({"MYSQL_BLOCKED_PATTERNS": "DROP TABLE,TRUNCATE"})
+    assert config.match_blocked("drop table t", BLOCKED_MATCH_WORD)
+    assert not config.match_blocked("DROP TABLES t", BLOCKED_MATCH_WORD)
+    assert not config.match_blocked("select * from truncated", BLOCKED_MATCH_WORD)
+    assert config.match_blocked("truncate   t", BLOCKED_MATCH_WORD)
+
+
+def test_match_blocked_regex():
+    """正则方式: 模式按正则匹配，带行内全局标志的模式仍可用，非法模式跳过而不影响其他模式"""
+    config = SessionConfigManager({"MYSQL_BLOCKED_PATTERNS": ["SELECT.*FROM SECRET"]})
+    assert config.match_blocked("select a from secret", BLOCKED_MATCH_REGEX)
+    assert not config.match_blocked("select a from public", BLOCKED_MATCH_REGEX)
+
+    # 行内全局标志只能出现在整个正则开头，无法合并时退回逐个模式匹配
+    matchers = SessionConfigManager._compile_blocked_matcher(("(?i)drop", "sleep\\("), BLOCKED_MATCH_REGEX)
+    assert any(m.search("DROP TABLE T") for m in matchers)
+    assert any(m.search("SELECT SLEEP(1)") for m in matchers)
+    assert not any(m.search("SELECT 1") for m in matchers)
+
+    config = SessionConfigManager({"MYSQL_BLOCKED_PATTERNS": ["UNION(", "DROP TABLE"]})
+    assert config.match_blocked("drop table t", BLOCKED_MATCH_REGEX)
+    assert not config.match_blocked("select 1 union( select 2", BLOCKED_MATCH_REGEX)
+
+
+def test_match_blocked_rebuilt_after_update():
+    """阻止模式变更后匹配器随之重建，克隆出的配置互不影响"""
+    config = SessionConfigManager({"MYSQL_BLOCKED_PATTERNS": "DROP TABLE"})
+    clone = config.clone()
+    for mode in (BLOCKED_MATCH_SUBSTRING, BLOCKED_MATCH_WORD, BLOCKED_MATCH_REGEX):
+        assert not config.match_blocked("select * from t", mode)
+
+    config.update({"MYSQL_BLOCKED_PATTERNS": "SELECT"})
+    for mode in (BLOCKED_MATCH_SUBSTRING, BLOCKED_MATCH_WORD, BLOCKED_MATCH_REGEX):
+        assert config.match_blocked("select * from t", mode)
+        assert not config.match_blocked("drop table t", mode)
+        assert not clone.match_blocked("select * from t", mode)
+        assert clone.match_blocked("drop table t", mode)
+
+
+def test_external_config_mutated_in_place():
+    """原始配置字典被原地修改后，新建的会话配置读到最新内容，已创建的会话配置不受影响"""
+    raw = {"MYSQL_BLOCKED_PATTERNS": ["DROP TABLE"]}
+    first = SessionConfigManager(raw)
+    raw["MYSQL_BLOCKED_PATTERNS"].append("TRUNCATE")
+
+    assert "TRUNCATE" in SessionConfigManager(raw).get("MYSQL_BLOCKED_PATTERNS")
+    assert "TRUNCATE" not in first.get("MYSQL_BLOCKED_PATTERNS")
+
+
+if __name__ == "__main__":
+    test_match_blocked_substring()
+    test_match_blocked_word()
+    test_match_blocked_regex()
+    test_match_blocked_rebuilt_after_update()
+    test_external_config_mutated_in_place()
+    print("会话配置测试通过")
@@ -0,0 +1,64 @@
+from mcp_for_db.server.server_mysql.config import SessionConfigManager
+from mcp_for_db.server.shared.security import sql_parser
+from mcp_for_db.server.shared.security.sql_parser import SQLParser
+
+SESSION_CONFIG = SessionConfigManager({
+    "MYSQL_ALLOWED_RISK_LEVELS": "LOW,MEDIUM",
+    "MYSQL_BLOCKED_PATTERNS": "DROP TABLE,DELETE FROM",
+    "MYSQL_ALLOW_SENSITIVE_INFO": "false",
+    "MYSQL_ENABLE_DATABASE_ISOLATION": "true",
+    "MYSQL_DATABASE_ACCESS_LEVEL": "restricted",
+    "MYSQL_DATABASE": "tpch_tiny"
+})
+
+# 每组 SQL 只有数字字面量不同，应命中同一个字面量模板
+TEMPLATE_EQUAL_QUERIES = [
+    ("SELECT * FROM orders WHERE id = 1 LIMIT 10", "SELECT * FROM orders WHERE id = 42 LIMIT 500"),
+    ("UPDATE users SET age = 18 WHERE id = 7", "UPDATE users SET age = 99 WHERE id = 12345"),
+    ("DELETE FROM orders WHERE amount > 3.5", "DELETE FROM orders WHERE amount > 1000.25"),
+    ("INSERT INTO t_users VALUES (1, 'a')", "INSERT INTO t_users VALUES (2, 'a')"),
+    ("SELECT * FROM (SELECT 1 AS a) t WHERE a = 2", "SELECT * FROM (SELECT 3 AS a) t WHERE a = 4"),
+]
+
+
+def _security_view(parser: SQLParser, parsed_result):
+    """安全检查用到的解析字段与安全分析结论"""
+    analysis = parser.analyze_security(parsed_result)
+    return parsed_result, analysis['risk_level'], analysis['is_allowed'], analysis['reasons']
+
+
+def test_template_equal_queries_match_uncached_parse():
+    """模板相同的 SQL 复用缓存后，解析结果与安全结论和不带缓存的解析完全一致"""
+    parser = SQLParser(SESSION_CONFIG)
+    for first, second in TEMPLATE_EQUAL_QUERIES:
+        parser.parse_query(first)
+        template, _ = SQLParser._literal_template(second)
+        assert template in sql_parser._template_cache
+
+        assert _security_view(parser, parser.parse_query(second)) == \
+               _security_view(parser, SQLParser._parse_query(second))
+
+
+def test_string_literals_are_not_normalized():
+    """字符串字面量内容会影响表名、WHERE 检测，不能与其他字符串共用解析结果"""
+    parser = SQLParser(SESSION_CONFIG)
+    parser.parse_query("SELECT * FROM users WHERE name = 'abc' LIMIT 1")
+    result = parser.parse_query("SELECT * FROM users WHERE name = 'x FROM orders' LIMIT 1")
+    assert result == SQLParser._parse_query("SELECT * FROM users WHERE name = 'x FROM orders' LIMIT 1")
+
+
+def test_mutating_result_does_not_affect_cache():
+    """修改返回结果中的表名列表不影响后续同模板 SQL 的解析结果"""
+    parser = SQLParser(SESSION_CONFIG)
+    parser.parse_query("SELECT * FROM orders WHERE id = 1")["tables"].append("HACKED")
+    assert "HACKED" not in parser.parse_query("SELECT * FROM orders WHERE id = 2")["tables"]
+
+    parser.parse_query("SELECT * FROM orders; SELECT * FROM users")["tables"].append("HACKED")
+    assert "HACKED" not in parser.parse_query("SELECT * FROM orders; SELECT * FROM users")["tables"]
+
+
+if __name__ == "__main__":
+    test_template_equal_queries_match_uncached_parse()
+    test_string_literals_are_not_normalized()
+    test_mutating_result_does_not_affect_cache()
+    print("SQL 解析缓存测试通过")